@@ -1,6 +1,6 @@
 {
     'name': 'Book Borrower Portal',
-    'version': '1.0.0',
+    'version': '1.2.0',
     'category': 'Portal',
     'summary': 'Portal interface for library members to manage borrowed books and extension requests',
     'description': """
@@ -33,11 +33,20 @@ ensuring seamless integration with your current library management system.
         'data/ir_sequence_data.xml',
         'data/mail_templates.xml',
         'data/extension_config_data.xml',
+        'data/ir_cron_data.xml',
 
         # Views - Extension-related views
         'views/portal_template.xml',
         'views/extension_request_views.xml',
         'views/library_member_views.xml',
+        'views/library_member_category_views.xml',
+        'views/library_extension_auto_rule_views.xml',
+        'views/library_notification_outbox_views.xml',
+        'views/library_extension_import_views.xml',
+        'views/library_extension_ledger_views.xml',
+        'views/library_overdue_sweep_views.xml',
+        'views/library_analytics_views.xml',
+        'views/res_config_settings_views.xml',
         
         # Wizard views
         'wizard/extension_request_reject_wizard_views.xml',
@@ -50,6 +59,8 @@ ensuring seamless integration with your current library management system.
         'web.assets_frontend': [
             # 'book_borrower_portal/static/src/js/extension_request_form.js',  # TEMPORARILY DISABLED
             # 'book_borrower_portal/static/src/js/borrowed_books_filter.js',  # TEMPORARILY DISABLED
+            'book_borrower_portal/static/src/js/extension_eligibility.js',
+            'book_borrower_portal/static/src/js/borrowed_books_search.js',
             'book_borrower_portal/static/src/css/portal_styles.css',
         ]
     },
@@ -4,40 +4,251 @@ from odoo import http, fields, _
 from odoo.tools import groupby as groupbyelem
 from operator import itemgetter
 from odoo.exceptions import AccessError, UserError
-from datetime import timedelta
+from odoo.osv import expression
+from odoo.addons.book_borrower_portal.models.library_member import PORTAL_HOME_COUNTERS
+from datetime import date, datetime, time, timedelta, timezone
+from urllib.parse import urlencode
+from werkzeug.http import http_date
+from werkzeug.wsgi import wrap_file
+import base64
+import hashlib
+import json
 import logging
+import os
 
 _logger = logging.getLogger(__name__)
 
 
 class BookBorrowerPortal(CustomerPortal):
 
+    # Deepest page read with an offset; orders that cannot seek page no further
+    MAX_OFFSET_PAGES = 50
+
     def _prepare_home_portal_values(self, counters):
-        """Add library-specific counters to portal home - SIMPLIFIED"""
+        """Add library-specific counters to portal home, only those requested"""
         rtn = super(BookBorrowerPortal, self)._prepare_home_portal_values(counters)
-        rtn['library_member_counts'] = request.env['library.member'].search_count([])
-        # Get current user's library member (basic info only)
-        # member = request.env.user._get_library_member()
-        # if member:
-        #     # Only include fields that don't depend on disabled models
-        #     rtn.update({
-        #         'member': member,
-        #         # Disabled fields that depend on BorrowingRecord model:
-        #         # 'current_borrowed': member.current_borrowed,
-        #         # 'pending_extension_requests': member.pending_extension_requests,
-        #         # 'overdue_books_count': member.overdue_books_count,
-        #         # 'total_fines': member.total_fines,
-        #     })
-
+        if 'library_member_counts' in counters:
+            rtn['library_member_counts'] = request.env['library.member'].search_count([])
+        
+        library_counters = [counter for counter in counters if counter in PORTAL_HOME_COUNTERS]
+        if library_counters:
+            member = self._get_library_member()
+            member_counters = member._get_portal_counters() if member else {}
+            for counter in library_counters:
+                rtn[counter] = member_counters.get(counter, 0)
+        
         return rtn
 
+    def _get_library_member(self):
+        """Current user's library member, resolved once per HTTP request"""
+        member = getattr(request, '_library_member', None)
+        if member is None:
+            member = request.env.user._get_library_member()
+            request._library_member = member
+        return member
+
     def _get_member_or_redirect(self):
         """Get current user's library member or redirect to access denied"""
-        member = request.env.user._get_library_member()
+        member = self._get_library_member()
         if not member:
             return request.render('book_borrower_portal.no_member_access')
         return member
 
+    def _parse_int(self, value, default):
+        """Integer sent by the client, or default when it is missing or malformed"""
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return default
+
+    def _get_count_limit(self):
+        """Maximum number of records counted for the pager (0 counts everything)"""
+        return int(request.env['ir.config_parameter'].sudo().get_param(
+            'book_borrower_portal.pager_count_limit', 1000))
+
+    def _count_capped(self, Model, domain):
+        """Count records up to the configured limit, returns (count, is_capped)"""
+        count_limit = self._get_count_limit()
+        if count_limit <= 0:
+            return Model.search_count(domain), False
+        count = Model.search_count(domain, limit=count_limit + 1)
+        return min(count, count_limit), count > count_limit
+
+    def _get_keyset_order(self, Model, order):
+        """Parse an order string into [(field, direction)] ending with id.
+        
+        Returns None when the order goes through a relation, since those rows
+        cannot be compared against stored column values.
+        """
+        order_spec = []
+        for term in order.split(','):
+            parts = term.strip().split()
+            fname, direction = parts[0], (parts[1].lower() if len(parts) > 1 else 'asc')
+            field = Model._fields.get(fname)
+            if not field or not field.store or field.relational:
+                return None
+            order_spec.append((fname, direction))
+        if order_spec[-1][0] != 'id':
+            order_spec.append(('id', order_spec[-1][1]))
+        return order_spec
+
+    def _encode_cursor(self, record, order_spec):
+        """Serialize the sort key of record into an URL-safe cursor"""
+        values = []
+        for fname, _direction in order_spec:
+            value = record[fname]
+            if isinstance(value, date):
+                value = str(value)
+            values.append(value if value is not False else None)
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def _decode_cursor(self, cursor, order_spec):
+        """Parse a cursor, returning None when it is invalid"""
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (ValueError, TypeError):
+            return None
+        if not isinstance(values, list) or len(values) != len(order_spec):
+            return None
+        return values
+
+    def _get_keyset_domain(self, order_spec, values, forward=True):
+        """Domain of the rows strictly after (forward) or before the cursor values.
+        
+        NULLs sort as the greatest value, like PostgreSQL does by default.
+        """
+        clauses = []
+        equal_prefix = []
+        for (fname, direction), value in zip(order_spec, values):
+            want_greater = (direction == 'asc') == forward
+            if value is None:
+                comparison = [] if want_greater else [[(fname, '!=', False)]]
+            elif want_greater:
+                comparison = [['|', (fname, '>', value), (fname, '=', False)]]
+            else:
+                comparison = [[(fname, '<', value)]]
+            clauses += [expression.AND(equal_prefix + [clause]) for clause in comparison]
+            equal_prefix.append([(fname, '=', value if value is not None else False)])
+        return expression.OR(clauses) if clauses else expression.FALSE_DOMAIN
+
+    def _keyset_paginate(self, Model, domain, order, url, url_args, page=1, after=None, before=None, step=20):
+        """Fetch one page of records with seek pagination.
+        
+        Without a cursor the page is read with an offset; with after/before the page
+        is read right after/before the cursor row, so deep pages cost the same as the
+        first one. Orders that can seek only get Previous/Next links, the others
+        only the numbered pager, whose total is capped and which stops at
+        MAX_OFFSET_PAGES so no page costs a deep offset.
+        """
+        total, total_capped = self._count_capped(Model, domain)
+        order_spec = self._get_keyset_order(Model, order)
+        cursor = after or before
+        values = self._decode_cursor(cursor, order_spec) if cursor and order_spec else None
+        
+        page_detail = False
+        if values is not None:
+            forward = bool(after)
+            if forward:
+                seek_order = order
+            else:
+                seek_order = ', '.join(
+                    f"{fname} {'desc' if direction == 'asc' else 'asc'}" for fname, direction in order_spec)
+            records = Model.search(
+                expression.AND([domain, self._get_keyset_domain(order_spec, values, forward)]),
+                limit=step + 1,
+                order=seek_order
+            )
+            has_more = len(records) > step
+            records = records[:step]
+            if not forward:
+                records = records[::-1]
+            has_prev, has_next = (True, has_more) if forward else (has_more, True)
+        else:
+            # The pager clamps the page, so the offset stays below MAX_OFFSET_PAGES pages
+            page_detail = pager(
+                url=url,
+                total=min(total, self.MAX_OFFSET_PAGES * step),
+                page=page,
+                step=step,
+                url_args=url_args
+            )
+            records = Model.search(domain, limit=step + 1, offset=page_detail['offset'], order=order)
+            has_next = len(records) > step
+            records = records[:step]
+            has_prev = page_detail['offset'] > 0
+        
+        keyset_prev_url = keyset_next_url = False
+        if order_spec and records:
+            query_args = {key: value for key, value in url_args.items() if value}
+            if has_prev:
+                keyset_prev_url = f"{url}?{urlencode(dict(query_args, before=self._encode_cursor(records[0], order_spec)))}"
+            if has_next:
+                keyset_next_url = f"{url}?{urlencode(dict(query_args, after=self._encode_cursor(records[-1], order_spec)))}"
+        
+        return {
+            'records': records,
+            # One pager per order: seek links when the order can seek, page numbers otherwise
+            'pager': False if order_spec else page_detail,
+            'total': total,
+            'total_capped': total_capped,
+            'keyset_prev_url': keyset_prev_url,
+            'keyset_next_url': keyset_next_url,
+        }
+
+    def _get_page_validator(self, member, sources):
+        """Cheap validator of a member's portal page: (etag, last modified UTC datetime).
+        
+        sources is a list of (model name, domain) covering the records the page shows.
+        Each costs one aggregate query; deletions are caught through the row count.
+        """
+        user = request.env.user
+        today = fields.Date.context_today(user)
+        parts = [
+            member.id, user.id, user.write_date, request.env.lang, today,
+            # The page embeds a session-bound CSRF token
+            hashlib.sha1((request.session.sid or '').encode()).hexdigest(),
+        ]
+        # Pages show values relative to today (due dates, overdue days), so they expire daily
+        last_modified = datetime.combine(today, time.min)
+        for model_name, domain in sources:
+            [(count, last_write)] = request.env[model_name].sudo()._read_group(
+                domain, aggregates=['__count', 'write_date:max'])
+            parts += [model_name, count, last_write]
+            if last_write and last_write > last_modified:
+                last_modified = last_write
+        etag = hashlib.sha1(repr(parts).encode()).hexdigest()
+        return etag, last_modified.replace(microsecond=0, tzinfo=timezone.utc)
+
+    def _is_not_modified(self, validator):
+        """Whether the browser's copy is still valid, If-None-Match taking precedence"""
+        etag, last_modified = validator
+        httprequest = request.httprequest
+        if httprequest.if_none_match:
+            return httprequest.if_none_match.contains(etag)
+        if_modified_since = httprequest.if_modified_since
+        return bool(if_modified_since and if_modified_since >= last_modified)
+
+    def _get_cache_headers(self, validator):
+        """Private revalidation headers: never stored by shared caches"""
+        etag, last_modified = validator
+        return [
+            ('ETag', f'"{etag}"'),
+            ('Last-Modified', http_date(last_modified)),
+            ('Cache-Control', 'private, no-cache'),
+            ('Vary', 'Cookie'),
+        ]
+
+    def _render_cached(self, template, values, validator):
+        """Render a portal page with the conditional caching headers of validator"""
+        response = request.render(template, values)
+        for header, value in self._get_cache_headers(validator):
+            response.headers[header] = value
+        return response
+
+    def _make_not_modified_response(self, validator):
+        """Empty 304 answer, sent before any search or rendering"""
+        return request.make_response(b'', headers=self._get_cache_headers(validator), status=304)
+
     # Route: Create Member for Current User (Simplified)
     @http.route(['/my/create-member'], type='http', methods=['GET'], auth='user', website=True)
     def create_member_for_user(self, **kwargs):
@@ -83,6 +294,12 @@ class BookBorrowerPortal(CustomerPortal):
         if not isinstance(member, request.env['library.member'].__class__):
             return member  # Return the error page
         
+        validator = None
+        if request.httprequest.method == 'GET':
+            validator = self._get_page_validator(member, [('library.member', [('id', '=', member.id)])])
+            if self._is_not_modified(validator):
+                return self._make_not_modified_response(validator)
+        
         values = {
             'member': member,
             'page_name': 'member_profile',
@@ -137,11 +354,13 @@ class BookBorrowerPortal(CustomerPortal):
             if errors:
                 values['errors'] = errors
         
+        if validator:
+            return self._render_cached("book_borrower_portal.member_profile_view", values, validator)
         return request.render("book_borrower_portal.member_profile_view", values)
 
     # Route 2: Public Member List
     @http.route(['/my/members', '/my/members/page/<int:page>'], type='http', auth='user', website=True)
-    def member_list(self, page=1, search='', **kwargs):
+    def member_list(self, page=1, search='', after=None, before=None, **kwargs):
         """Display all library members"""
         
         # Search domain
@@ -149,33 +368,24 @@ class BookBorrowerPortal(CustomerPortal):
         if search:
             domain = ['|', ('name', 'ilike', search), ('email', 'ilike', search)]
         
-        # Get members
+        # Fetch member records (seek pagination with a capped count)
         Member = request.env['library.member']
-        total_members = Member.search_count(domain)
-        
-        # Pagination
-        page_detail = pager(
+        page_data = self._keyset_paginate(
+            Member, domain, 'name asc',
             url='/my/members',
-            total=total_members,
-            page=page,
-            step=20,
-            url_args={'search': search}
-        )
-        
-        # Fetch member records
-        members = Member.search(
-            domain,
-            limit=20,
-            offset=page_detail['offset'],
-            order='name asc'
+            url_args={'search': search},
+            page=page, after=after, before=before
         )
         
         values = {
-            'members': members,
+            'members': page_data['records'],
             'page_name': 'member_list',
-            'pager': page_detail,
+            'pager': page_data['pager'],
+            'keyset_prev_url': page_data['keyset_prev_url'],
+            'keyset_next_url': page_data['keyset_next_url'],
             'search': search,
-            'total_members': total_members,
+            'total_members': page_data['total'],
+            'total_capped': page_data['total_capped'],
         }
         
         return request.render("book_borrower_portal.member_list_view", values)
@@ -183,12 +393,20 @@ class BookBorrowerPortal(CustomerPortal):
     # Route 3: Borrowed Books List - TEMPORARILY DISABLED
     @http.route(['/my/borrowed-books', '/my/borrowed-books/page/<int:page>'],
                  type='http', auth='user', website=True)
-    def borrowed_books_list(self, page=1, sortby='sequence', filterby='all', search='', **kwargs):
+    def borrowed_books_list(self, page=1, sortby='sequence', filterby='all', search='', after=None, before=None, **kwargs):
         """Display all borrowed books"""
         member = self._get_member_or_redirect()
         if not isinstance(member, request.env['library.member'].__class__):
             return member
         
+        # Answer revisits of an unchanged list before searching anything
+        validator = self._get_page_validator(member, [
+            ('library.member', [('id', '=', member.id)]),
+            ('library.borrowing.record', [('member_id', '=', member.id)]),
+        ])
+        if self._is_not_modified(validator):
+            return self._make_not_modified_response(validator)
+        
         # Sorting options using correct field names
         sort_options = {
             'sequence': {'label': 'Record Number', 'order': 'sequence desc'},
@@ -208,34 +426,28 @@ class BookBorrowerPortal(CustomerPortal):
         # Build search domain
         domain = filter_options[filterby]['domain']
         if search:
-            domain += [('book_title', 'ilike', search)]
+            # Title, author or ISBN, served by the trigram indexes on books
+            domain += request.env['library.borrowing.search']._get_search_domain(search)
         
-        # Get borrowing records
+        # Get borrowing records (seek pagination with a capped count)
         BorrowingRecord = request.env['library.borrowing.record']
-        total_records = BorrowingRecord.search_count(domain)
-        
-        # Pagination
-        page_detail = pager(
+        page_data = self._keyset_paginate(
+            BorrowingRecord, domain, sort_options[sortby]['order'],
             url='/my/borrowed-books',
-            total=total_records,
-            page=page,
-            step=20,
-            url_args={'sortby': sortby, 'filterby': filterby, 'search': search}
-        )
-        
-        # Fetch records
-        borrowing_records = BorrowingRecord.search(
-            domain,
-            limit=20,
-            offset=page_detail['offset'],
-            order=sort_options[sortby]['order']
+            url_args={'sortby': sortby, 'filterby': filterby, 'search': search},
+            page=page, after=after, before=before
         )
+        borrowing_records = page_data['records']
         
         values = {
             'borrowing_records': borrowing_records,
             'member': member,
             'page_name': 'borrowed_books',
-            'pager': page_detail,
+            'pager': page_data['pager'],
+            'keyset_prev_url': page_data['keyset_prev_url'],
+            'keyset_next_url': page_data['keyset_next_url'],
+            'total_records': page_data['total'],
+            'total_capped': page_data['total_capped'],
             'sortby': sortby,
             'filterby': filterby,
             'search': search,
@@ -243,7 +455,7 @@ class BookBorrowerPortal(CustomerPortal):
             'filter_options': filter_options,
         }
         
-        return request.render("book_borrower_portal.borrowed_books_list_view", values)
+        return self._render_cached("book_borrower_portal.borrowed_books_list_view", values, validator)
 
     # Route 3: Book Borrow Details
     @http.route(['/my/borrowed-books/<int:borrowing_id>'], type='http', auth='user', website=True)
@@ -258,32 +470,41 @@ class BookBorrowerPortal(CustomerPortal):
         if not borrowing_record.exists() or borrowing_record.member_id != member:
             return request.not_found()
         
-        # Navigation between records
-        all_records = request.env['library.borrowing.record'].search([
-            ('member_id', '=', member.id)
-        ], order='sequence desc')
-        
-        record_ids = all_records.ids
-        current_index = record_ids.index(borrowing_record.id)
-        
-        prev_record = next_record = False
-        if current_index > 0:
-            prev_record = all_records.browse(record_ids[current_index - 1])
-        if current_index < len(record_ids) - 1:
-            next_record = all_records.browse(record_ids[current_index + 1])
-        
-        # Check for pending extension requests
-        pending_extension_request = request.env['library.extension.request'].search([
-            ('borrowing_record_id', '=', borrowing_record.id),
-            ('status', '=', 'pending')
-        ], limit=1)
-        
-        # Check if extension can be requested
-        can_request_extension = (
-            borrowing_record.status == 'borrowed' and
-            borrowing_record.expected_return_date >= fields.Date.today() and
-            not pending_extension_request
-        )
+        # The member's records cover the navigation links, the requests the extension block
+        validator = self._get_page_validator(member, [
+            ('library.member', [('id', '=', member.id)]),
+            ('library.borrowing.record', [('member_id', '=', member.id)]),
+            ('library.extension.request', [('borrowing_record_id', '=', borrowing_record.id)]),
+        ])
+        if self._is_not_modified(validator):
+            return self._make_not_modified_response(validator)
+        
+        # Navigation between records: neighbours in 'sequence desc' order, fetched with
+        # two index seeks in a single query instead of loading the member's whole history
+        BorrowingRecord = request.env['library.borrowing.record']
+        BorrowingRecord.flush_model(['member_id', 'sequence'])
+        request.env.cr.execute("""
+            SELECT (SELECT id
+                      FROM library_borrowing_record
+                     WHERE member_id = %(member_id)s
+                       AND (sequence, id) > (%(sequence)s, %(id)s)
+                  ORDER BY sequence, id
+                     LIMIT 1),
+                   (SELECT id
+                      FROM library_borrowing_record
+                     WHERE member_id = %(member_id)s
+                       AND (sequence, id) < (%(sequence)s, %(id)s)
+                  ORDER BY sequence DESC, id DESC
+                     LIMIT 1)
+        """, {'member_id': member.id, 'sequence': borrowing_record.sequence, 'id': borrowing_record.id})
+        prev_id, next_id = request.env.cr.fetchone()
+        prev_record = BorrowingRecord.browse(prev_id) if prev_id else False
+        next_record = BorrowingRecord.browse(next_id) if next_id else False
+        
+        # Extension eligibility and pending request from the shared eligibility service
+        eligibility = request.env['library.extension.eligibility']._get_eligibility(borrowing_record)[borrowing_record.id]
+        pending_extension_request = request.env['library.extension.request'].browse(eligibility['pending_request_id'])
+        can_request_extension = eligibility['reason'] == 'eligible'
         
         values = {
             'borrowing_record': borrowing_record,
@@ -295,7 +516,7 @@ class BookBorrowerPortal(CustomerPortal):
             'can_request_extension': can_request_extension,
         }
         
-        return request.render("book_borrower_portal.borrowing_detail_view", values)
+        return self._render_cached("book_borrower_portal.borrowing_detail_view", values, validator)
 
     # Route 4: Request Extension
     @http.route(['/my/borrowed-books/<int:borrowing_id>/request-extension'], 
@@ -312,24 +533,12 @@ class BookBorrowerPortal(CustomerPortal):
             return request.not_found()
         
         # Check if extension can be requested
-        can_request = (
-            borrowing_record.status == 'borrowed' and
-            borrowing_record.expected_return_date >= fields.Date.today()
-        )
-        
-        # Check for existing pending requests
-        existing_pending_request = request.env['library.extension.request'].search([
-            ('borrowing_record_id', '=', borrowing_record.id),
-            ('status', '=', 'pending')
-        ], limit=1)
-        
-        if not can_request or existing_pending_request:
-            reason = None
-            if not can_request and borrowing_record.status != 'borrowed':
-                reason = "This book is not currently borrowed."
-            elif not can_request and borrowing_record.expected_return_date < fields.Date.today():
-                reason = "This book is overdue. Extensions cannot be requested for overdue books."
-            elif existing_pending_request:
+        Eligibility = request.env['library.extension.eligibility']
+        eligibility = Eligibility._get_eligibility(borrowing_record)[borrowing_record.id]
+        if eligibility['reason'] != 'eligible':
+            existing_pending_request = request.env['library.extension.request'].browse(eligibility['pending_request_id'])
+            reason = Eligibility._get_reason_message(eligibility['reason'])
+            if existing_pending_request:
                 reason = f"There is already a pending extension request ({existing_pending_request.name}) for this borrowing record. Please wait for it to be processed."
             
             return request.render("book_borrower_portal.extension_not_allowed", {
@@ -339,10 +548,9 @@ class BookBorrowerPortal(CustomerPortal):
                 'existing_request': existing_pending_request
             })
         
-        # Default extension date (14 days from expected return date)
-        default_extension_days = int(request.env['ir.config_parameter'].sudo().get_param(
-            'book_borrower_portal.extension_days', 14))
-        default_requested_date = borrowing_record.expected_return_date + timedelta(days=default_extension_days)
+        # Default extension date (policy extension days from the current expiry date)
+        policy = request.env['library.extension.policy']._get_member_policy(member)
+        default_requested_date = eligibility['expiry_date'] + timedelta(days=policy.extension_days)
         
         values = {
             'borrowing_record': borrowing_record,
@@ -386,10 +594,64 @@ class BookBorrowerPortal(CustomerPortal):
         
         return request.render("book_borrower_portal.extension_request_form", values)
 
+    # Route 3b: Ranked search over the member's borrowing history
+    @http.route(['/my/borrowed-books/search'], type='json', auth='user', website=True)
+    def borrowed_books_search(self, query='', filterby='all', page=1, limit=10, **kwargs):
+        """Return one page of the member's borrowing records best matching query"""
+        member = self._get_library_member()
+        query = (query or '').strip()
+        if not member or len(query) < 2:
+            return {'results': [], 'page': 1, 'has_more': False}
+        
+        page = max(self._parse_int(page, 1), 1)
+        limit = min(max(self._parse_int(limit, 10), 1), 50)
+        records, has_more = request.env['library.borrowing.search']._search_history(
+            member, query, filterby=filterby, limit=limit, offset=(page - 1) * limit)
+        return {
+            'results': [{
+                'id': record.id,
+                'sequence': record.sequence,
+                'book_title': record.book_id.title,
+                'author': record.book_id.author or '',
+                'isbn': record.book_id.isbn or '',
+                'status': record.status,
+                'expected_return_date': fields.Date.to_string(record.expected_return_date),
+                'url': f'/my/borrowed-books/{record.id}',
+            } for record in records],
+            'page': page,
+            'has_more': has_more,
+        }
+
+    # Route 4b: Extension eligibility of a page of borrowing records
+    @http.route(['/my/borrowed-books/extension-eligibility'], type='json', auth='user', website=True)
+    def borrowing_extension_eligibility(self, borrowing_ids=None, **kwargs):
+        """Return the extension eligibility of several borrowing records in one call"""
+        member = self._get_library_member()
+        if not member or not borrowing_ids:
+            return {}
+        
+        # Only the member's own records, whatever ids were posted
+        borrowing_records = request.env['library.borrowing.record'].search([
+            ('id', 'in', [int(borrowing_id) for borrowing_id in borrowing_ids[:200]]),
+            ('member_id', '=', member.id),
+        ])
+        Eligibility = request.env['library.extension.eligibility']
+        return {
+            borrowing_id: {
+                'eligible': data['reason'] == 'eligible',
+                'reason': data['reason'],
+                'message': Eligibility._get_reason_message(data['reason']),
+                'expiry_date': fields.Date.to_string(data['expiry_date']),
+                'pending_request_id': data['pending_request_id'],
+                'url': f'/my/borrowed-books/{borrowing_id}/request-extension',
+            }
+            for borrowing_id, data in Eligibility._get_eligibility(borrowing_records).items()
+        }
+
     # Route 5: Extension Requests History
     @http.route(['/my/extension-requests', '/my/extension-requests/page/<int:page>'], 
                 type='http', auth='user', website=True)
-    def extension_requests_list(self, page=1, sortby='request_date', filterby='all', **kwargs):
+    def extension_requests_list(self, page=1, sortby='request_date', filterby='all', after=None, before=None, **kwargs):
         """View all extension requests"""
         member = self._get_member_or_redirect()
         if not isinstance(member, request.env['library.member'].__class__):
@@ -399,7 +661,7 @@ class BookBorrowerPortal(CustomerPortal):
         sort_options = {
             'request_date': {'label': 'Request Date', 'order': 'request_date desc'},
             'status': {'label': 'Status', 'order': 'status, request_date desc'},
-            'book_title': {'label': 'Book Title', 'order': 'book_id, request_date desc'}
+            'book_title': {'label': 'Book Title', 'order': 'book_title, request_date desc'}
         }
         
         # Filter options
@@ -413,32 +675,25 @@ class BookBorrowerPortal(CustomerPortal):
         # Build domain
         domain = filter_options[filterby]['domain']
         
-        # Get extension requests
+        # Get extension requests (seek pagination with a capped count)
         ExtensionRequest = request.env['library.extension.request']
-        total_requests = ExtensionRequest.search_count(domain)
-        
-        # Pagination
-        page_detail = pager(
+        page_data = self._keyset_paginate(
+            ExtensionRequest, domain, sort_options[sortby]['order'],
             url='/my/extension-requests',
-            total=total_requests,
-            page=page,
-            step=20,
-            url_args={'sortby': sortby, 'filterby': filterby}
-        )
-        
-        # Fetch requests
-        extension_requests = ExtensionRequest.search(
-            domain,
-            limit=20,
-            offset=page_detail['offset'],
-            order=sort_options[sortby]['order']
+            url_args={'sortby': sortby, 'filterby': filterby},
+            page=page, after=after, before=before
         )
+        extension_requests = page_data['records']
         
         values = {
             'extension_requests': extension_requests,
             'member': member,
             'page_name': 'extension_requests',
-            'pager': page_detail,
+            'pager': page_data['pager'],
+            'keyset_prev_url': page_data['keyset_prev_url'],
+            'keyset_next_url': page_data['keyset_next_url'],
+            'total_requests': page_data['total'],
+            'total_capped': page_data['total_capped'],
             'sortby': sortby,
             'filterby': filterby,
             'sort_options': sort_options,
@@ -460,13 +715,64 @@ class BookBorrowerPortal(CustomerPortal):
         if not extension_request.exists() or extension_request.member_id != member:
             return request.not_found()
         
+        validator = self._get_page_validator(member, [
+            ('library.member', [('id', '=', member.id)]),
+            ('library.extension.request', [('id', '=', extension_request.id)]),
+            ('library.borrowing.record', [('id', '=', extension_request.borrowing_record_id.id)]),
+        ])
+        if self._is_not_modified(validator):
+            return self._make_not_modified_response(validator)
+        
         values = {
             'extension_request': extension_request,
             'member': member,
             'page_name': 'extension_request_detail',
         }
         
-        return request.render("book_borrower_portal.extension_request_detail_view", values)
+        return self._render_cached("book_borrower_portal.extension_request_detail_view", values, validator)
+
+    def _make_report_response(self, record, filename):
+        """Serve the cached PDF report of record with conditional GET support"""
+        ReportCache = request.env['library.report.cache']
+        version, last_modified = ReportCache._get_report_validator(record)
+        validator = (version, last_modified.replace(microsecond=0, tzinfo=timezone.utc))
+        cache_headers = self._get_cache_headers(validator)
+        
+        # Repeat downloads of an unchanged record are answered without a body
+        if self._is_not_modified(validator):
+            return self._make_not_modified_response(validator)
+        
+        pdf_content = ReportCache._get_report_pdf(record, version=version)
+        
+        # Set up the response
+        pdfhttpheaders = [
+            ('Content-Type', 'application/pdf'),
+            ('Content-Length', len(pdf_content)),
+            ('Content-Disposition', f'attachment; filename="{filename}.pdf"')
+        ] + cache_headers
+        
+        return request.make_response(pdf_content, headers=pdfhttpheaders)
+
+    def _make_report_html_fallback(self, record, report_name, filename, error):
+        """Render the HTML version of a report when PDF generation fails"""
+        try:
+            values = {
+                'docs': [record],
+                'doc_ids': [record.id],
+                'doc_model': record._name,
+                'datetime': __import__('datetime'),
+            }
+            html_content = request.env['ir.qweb']._render(report_name, values)
+            
+            return request.make_response(html_content, headers=[
+                ('Content-Type', 'text/html'),
+                ('Content-Disposition', f'inline; filename="{filename}.html"')
+            ])
+        except Exception as html_error:
+            _logger.error(f"Error generating HTML fallback: {str(html_error)}")
+            # Final fallback: simple text response
+            error_msg = f"Error generating report: {str(error)}\nHTML fallback error: {str(html_error)}"
+            return request.make_response(error_msg, headers=[('Content-Type', 'text/plain')])
 
     # Route 7: Download Borrowing Report
     @http.route(['/my/borrowed-books/print/<int:borrowing_id>'], 
@@ -482,54 +788,14 @@ class BookBorrowerPortal(CustomerPortal):
         if not borrowing_record.exists() or borrowing_record.member_id != member:
             return request.not_found()
         
-        # Generate and return PDF report
+        filename = f'Borrowing_Record_{borrowing_record.sequence}'
         try:
-            # Try to find the report action
-            report_action = request.env['ir.actions.report'].search([
-                ('report_name', '=', 'book_borrower_portal.borrowing_record_report_template')
-            ], limit=1)
-            
-            if not report_action:
-                # Create a simple report action on the fly if not found
-                report_action = request.env['ir.actions.report'].sudo().create({
-                    'name': 'Borrowing Record Report',
-                    'model': 'library.borrowing.record',
-                    'report_type': 'qweb-pdf',
-                    'report_name': 'book_borrower_portal.borrowing_record_report_template',
-                })
-            
-            pdf_content, content_type = report_action._render_qweb_pdf(borrowing_record.ids)
-            
-            # Set up the response
-            pdfhttpheaders = [
-                ('Content-Type', 'application/pdf'),
-                ('Content-Length', len(pdf_content)),
-                ('Content-Disposition', f'attachment; filename="Borrowing_Record_{borrowing_record.sequence}.pdf"')
-            ]
-            
-            return request.make_response(pdf_content, headers=pdfhttpheaders)
-            
+            return self._make_report_response(borrowing_record, filename)
         except Exception as e:
             _logger.error(f"Error generating borrowing record PDF: {str(e)}")
             # Fallback: render HTML version if PDF fails
-            try:
-                values = {
-                    'docs': [borrowing_record],
-                    'doc_ids': [borrowing_record.id],
-                    'doc_model': 'library.borrowing.record',
-                    'datetime': __import__('datetime'),
-                }
-                html_content = request.env['ir.qweb']._render('book_borrower_portal.borrowing_record_report_template', values)
-                
-                return request.make_response(html_content, headers=[
-                    ('Content-Type', 'text/html'),
-                    ('Content-Disposition', f'inline; filename="Borrowing_Record_{borrowing_record.sequence}.html"')
-                ])
-            except Exception as html_error:
-                _logger.error(f"Error generating HTML fallback: {str(html_error)}")
-                # Final fallback: simple text response
-                error_msg = f"Error generating report: {str(e)}\nHTML fallback error: {str(html_error)}"
-                return request.make_response(error_msg, headers=[('Content-Type', 'text/plain')])
+            return self._make_report_html_fallback(
+                borrowing_record, 'book_borrower_portal.borrowing_record_report_template', filename, e)
 
     # Route 8: Download Extension Request Report
     @http.route(['/my/extension-requests/print/<int:request_id>'], 
@@ -545,51 +811,87 @@ class BookBorrowerPortal(CustomerPortal):
         if not extension_request.exists() or extension_request.member_id != member:
             return request.not_found()
         
-        # Generate and return PDF report
+        filename = f'Extension_Request_{extension_request.name}'
         try:
-            # Try to find the report action
-            report_action = request.env['ir.actions.report'].search([
-                ('report_name', '=', 'book_borrower_portal.extension_request_report_template')
-            ], limit=1)
-            
-            if not report_action:
-                # Create a simple report action on the fly if not found
-                report_action = request.env['ir.actions.report'].sudo().create({
-                    'name': 'Extension Request Report',
-                    'model': 'library.extension.request',
-                    'report_type': 'qweb-pdf',
-                    'report_name': 'book_borrower_portal.extension_request_report_template',
-                })
-            
-            pdf_content, content_type = report_action._render_qweb_pdf([extension_request.id])
-            
-            # Set up the response
-            pdfhttpheaders = [
-                ('Content-Type', 'application/pdf'),
-                ('Content-Length', len(pdf_content)),
-                ('Content-Disposition', f'attachment; filename="Extension_Request_{extension_request.name}.pdf"')
-            ]
-            
-            return request.make_response(pdf_content, headers=pdfhttpheaders)
-            
+            return self._make_report_response(extension_request, filename)
         except Exception as e:
             _logger.error(f"Error generating extension request PDF: {str(e)}")
             # Fallback: render HTML version if PDF fails
-            try:
-                values = {
-                    'docs': [extension_request],
-                    'doc_ids': [extension_request.id],
-                    'doc_model': 'library.extension.request',
-                    'datetime': __import__('datetime'),
-                }
-                html_content = request.env['ir.qweb']._render('book_borrower_portal.extension_request_report_template', values)
-                
-                return request.make_response(html_content, headers=[
-                    ('Content-Type', 'text/html'),
-                    ('Content-Disposition', f'inline; filename="Extension_Request_{extension_request.name}.html"')
-                ])
-            except Exception as html_error:
-                _logger.error(f"Error generating HTML fallback: {str(html_error)}")
-                # Final fallback: simple text response
-                error_msg = f"Error generating report: {str(e)}\nHTML fallback error: {str(html_error)}"
-                return request.make_response(error_msg, headers=[('Content-Type', 'text/plain')])
+            return self._make_report_html_fallback(
+                extension_request, 'book_borrower_portal.extension_request_report_template', filename, e)
+
+    def _export_documents(self, res_model, export_format='pdf', date_from=None, date_to=None):
+        """Export many documents of the current member as one PDF or a ZIP archive"""
+        member = self._get_member_or_redirect()
+        if not isinstance(member, request.env['library.member'].__class__):
+            return member
+        
+        Export = request.env['library.report.export'].sudo()
+        if export_format not in ('pdf', 'zip'):
+            export_format = 'pdf'
+        try:
+            date_from = fields.Date.to_date(date_from) if date_from else False
+            date_to = fields.Date.to_date(date_to) if date_to else False
+        except ValueError:
+            return request.not_found()
+        
+        vals = {
+            'name': f"{dict(Export._fields['res_model'].selection)[res_model]} - {member.name}",
+            'user_id': request.env.user.id,
+            'member_id': member.id,
+            'res_model': res_model,
+            'export_format': export_format,
+            'date_from': date_from,
+            'date_to': date_to,
+        }
+        
+        # Small exports are rendered right away, large ones by the background worker
+        export = Export.new(vals)
+        document_count = request.env[res_model].search_count(export._get_export_domain())
+        if document_count > Export.SYNC_LIMIT:
+            # Submitting the same export again waits for the queued one
+            export = export._find_pending() or Export.create(vals)
+            if export.state != 'running':
+                export._schedule()
+            return request.render("book_borrower_portal.report_export_queued", {
+                'member': member,
+                'export': export,
+                'document_count': document_count,
+                'page_name': 'report_export',
+            })
+        
+        try:
+            fileobj = export._generate_file()
+        except UserError as e:
+            return request.make_response(str(e), headers=[('Content-Type', 'text/plain')])
+        
+        # Streamed from the temporary file, which is closed once sent
+        response = request.make_response(wrap_file(request.httprequest.environ, fileobj), headers=[
+            ('Content-Type', export._get_mimetype()),
+            ('Content-Length', os.fstat(fileobj.fileno()).st_size),
+            ('Content-Disposition', f'attachment; filename="{export._get_filename()}"'),
+        ])
+        response.direct_passthrough = True
+        return response
+
+    # Route 9: Export Borrowing History
+    @http.route(['/my/borrowed-books/export'], type='http', methods=['POST'], auth='user', website=True)
+    def borrowing_history_export(self, export_format='pdf', date_from=None, date_to=None, **kwargs):
+        """Export the member's borrowing records as one PDF or a ZIP archive"""
+        return self._export_documents('library.borrowing.record', export_format, date_from, date_to)
+
+    # Route 10: Export Extension Requests
+    @http.route(['/my/extension-requests/export'], type='http', methods=['POST'], auth='user', website=True)
+    def extension_requests_export(self, export_format='pdf', date_from=None, date_to=None, **kwargs):
+        """Export the member's extension requests as one PDF or a ZIP archive"""
+        return self._export_documents('library.extension.request', export_format, date_from, date_to)
+
+    # Route 11: Download Background Export
+    @http.route(['/my/exports/<int:export_id>/download'], type='http', auth='user', website=True)
+    def report_export_download(self, export_id, **kwargs):
+        """Download an export generated in the background"""
+        export = request.env['library.report.export'].sudo().browse(export_id)
+        if not export.exists() or export.user_id != request.env.user or not export.attachment_id:
+            return request.not_found()
+        
+        return request.env['ir.binary']._get_stream_from(export.attachment_id).get_response(as_attachment=True)
@@ -0,0 +1,33 @@
+import logging
+
+from odoo import sql_db
+from odoo.tools.sql import column_exists, create_column
+
+from odoo.addons.book_borrower_portal.models.library_extension_request import create_portal_list_indexes
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    """Fill the new book title sort key in SQL and build the portal list indexes concurrently"""
+    if not version:
+        return
+    
+    # Filling the column here spares the ORM a record-by-record recompute of the related field
+    if not column_exists(cr, 'library_extension_request', 'book_title'):
+        create_column(cr, 'library_extension_request', 'book_title', 'varchar')
+        cr.execute("""
+            UPDATE library_extension_request req
+               SET book_title = book.title
+              FROM library_book book
+             WHERE book.id = req.book_id
+        """)
+        _logger.info("Filled book_title on %s extension requests", cr.rowcount)
+    
+    # CREATE INDEX CONCURRENTLY cannot run in a transaction block and waits for every
+    # older transaction, including the upgrade's own: commit, then build on a separate
+    # autocommit connection so the tables stay writable during the build
+    cr.commit()
+    with sql_db.db_connect(cr.dbname).cursor() as index_cr:
+        index_cr._cnx.autocommit = True
+        create_portal_list_indexes(index_cr, concurrently=True)
@@ -0,0 +1,25 @@
+import logging
+
+from odoo import sql_db
+
+from odoo.addons.book_borrower_portal.models.library_extension_request import (
+    create_text_search_index,
+    create_text_search_vector,
+)
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    """Add the full-text search column and build its GIN index concurrently"""
+    if not version:
+        return
+    
+    # Adding a stored generated column rewrites the table once; the index build
+    # afterwards does not block writes
+    create_text_search_vector(cr)
+    cr.commit()
+    with sql_db.db_connect(cr.dbname).cursor() as index_cr:
+        index_cr._cnx.autocommit = True
+        create_text_search_index(index_cr, concurrently=True)
+    _logger.info("Full-text search index of extension requests is ready")
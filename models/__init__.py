@@ -1,4 +1,24 @@
 from . import library_extension_request
-# from . import library_borrowing_record  # TEMPORARILY DISABLED - causing model name conflict
+from . import library_book
+from . import library_borrowing_search
+from . import library_borrowing_record
+from . import library_due_reminder
+from . import library_extension_auto_rule
+from . import library_extension_eligibility
+from . import library_extension_import
+from . import library_extension_ledger
+from . import library_extension_policy
+from . import library_librarian
 from . import library_member
-from . import res_users
\ No newline at end of file
+from . import library_member_category
+from . import library_notification_outbox
+from . import library_overdue_sweep
+from . import library_portal_login
+from . import library_report_cache
+from . import library_report_export
+from . import res_config_settings
+from . import res_users
+# Materialized views over the tables above, created after them
+from . import library_analytics_view
+from . import library_borrowing_analysis
+from . import library_extension_analysis
\ No newline at end of file
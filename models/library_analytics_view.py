@@ -0,0 +1,84 @@
+from odoo import models, api
+from odoo.tools import SQL
+import hashlib
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+class LibraryAnalyticsView(models.AbstractModel):
+    _name = 'library.analytics.view'
+    _description = 'Library Analytics Materialized View'
+    _auto = False
+    
+    # Ratio measures recomputed from summed counts in reports:
+    # {field name: (numerator field, denominator field, factor)}
+    _ratio_measures = {}
+    
+    # Method of the concrete views returning the SQL that aggregates their rows, with
+    # a unique integer id column; views without one are not created
+    _query = None
+    
+    @api.model
+    def _group_id(self, *keys):
+        """Id column derived from the group keys, so a row keeps its id across refreshes.
+        
+        52 bits of their hash keep ids exact in the web client.
+        """
+        return SQL("('x' || substr(md5(ROW(%s)::text), 1, 13))::bit(52)::bigint", SQL(", ").join(keys))
+    
+    def init(self):
+        """Create the materialized view and its unique index when missing or when the query changed.
+        
+        The hash of the query is stored as the comment of the view, so upgrades
+        that leave the query untouched keep the view and its data.
+        """
+        if self._abstract or not self._query:
+            return
+        cr = self.env.cr
+        table = SQL.identifier(self._table)
+        query = self._query()
+        signature = hashlib.sha1(repr((query.code, query.params)).encode()).hexdigest()
+        cr.execute("SELECT obj_description(to_regclass(%s), 'pg_class')", [self._table])
+        if cr.fetchone()[0] == signature:
+            return
+        _logger.info("Creating analytics view %s", self._table)
+        cr.execute(SQL("DROP MATERIALIZED VIEW IF EXISTS %s", table))
+        cr.execute(SQL("CREATE MATERIALIZED VIEW %s AS (%s)", table, query))
+        cr.execute(SQL("CREATE UNIQUE INDEX %s ON %s (id)", SQL.identifier(f'{self._table}_id_idx'), table))
+        cr.execute(SQL("COMMENT ON MATERIALIZED VIEW %s IS %s", table, signature))
+    
+    @api.model
+    def _read_group_select(self, aggregate_spec, query):
+        """Ratios are computed from the summed counts of the group, not averaged over rows"""
+        fname, _sep, _aggregator = aggregate_spec.partition(':')
+        if fname in self._ratio_measures:
+            numerator, denominator, factor = self._ratio_measures[fname]
+            return SQL(
+                "%s * SUM(%s) / NULLIF(SUM(%s), 0)",
+                factor,
+                self._field_to_sql(self._table, numerator, query),
+                self._field_to_sql(self._table, denominator, query),
+            )
+        return super()._read_group_select(aggregate_spec, query)
+    
+    def _refresh(self):
+        """Refresh the view without blocking the dashboards reading it"""
+        self.env.cr.execute(SQL("REFRESH MATERIALIZED VIEW CONCURRENTLY %s", SQL.identifier(self._table)))
+        self.invalidate_model()
+    
+    @api.model
+    def _cron_refresh(self):
+        """Refresh every analytics view, committing after each one"""
+        self.env.flush_all()
+        for model_name in sorted(self._inherit_children):
+            Model = self.env[model_name]
+            if Model._abstract or not Model._query:
+                continue
+            try:
+                with self.env.cr.savepoint():
+                    Model._refresh()
+            except Exception as e:
+                _logger.warning("Refresh of analytics view %s failed: %s", model_name, e)
+                continue
+            self.env.cr.commit()
@@ -0,0 +1,61 @@
+from odoo import models, fields
+from odoo.tools import SQL
+from odoo.tools.sql import column_exists
+
+
+class LibraryBorrowingAnalysis(models.Model):
+    _name = 'library.borrowing.analysis'
+    _inherit = 'library.analytics.view'
+    _description = 'Library Borrowing Analysis'
+    _auto = False
+    _rec_name = 'month'
+    _order = 'month desc'
+    
+    _ratio_measures = {
+        'overdue_rate': ('overdue_count', 'borrowing_count', 100.0),
+        'extension_rate': ('extended_count', 'borrowing_count', 100.0),
+    }
+    
+    month = fields.Date(string='Month', readonly=True)
+    book_id = fields.Many2one('library.book', string='Book', readonly=True)
+    member_category_id = fields.Many2one('library.member.category', string='Member Category', readonly=True)
+    status = fields.Char(string='Status', readonly=True)
+    borrowing_count = fields.Integer(string='Borrowings', readonly=True)
+    overdue_count = fields.Integer(string='Overdue', readonly=True,
+                                   help='Borrowings overdue now or returned after their due date')
+    extended_count = fields.Integer(string='Extended', readonly=True,
+                                    help='Borrowings with at least one extension')
+    extension_count = fields.Integer(string='Extensions', readonly=True)
+    fine_amount = fields.Float(string='Fines', readonly=True)
+    overdue_rate = fields.Float(string='Overdue Rate (%)', readonly=True, aggregator='avg')
+    extension_rate = fields.Float(string='Extension Rate (%)', readonly=True, aggregator='avg')
+    
+    def _query(self):
+        """Borrowings per month, book, member category and status"""
+        fines = SQL("SUM(br.fine_amount)") \
+            if column_exists(self.env.cr, 'library_borrowing_record', 'fine_amount') else SQL("0")
+        group_id = self._group_id(
+            SQL("grouped.month"), SQL("grouped.book_id"), SQL("grouped.member_category_id"), SQL("grouped.status"))
+        return SQL("""
+            SELECT %s AS id,
+                   grouped.*,
+                   100.0 * grouped.overdue_count / grouped.borrowing_count AS overdue_rate,
+                   100.0 * grouped.extended_count / grouped.borrowing_count AS extension_rate
+              FROM (
+                       SELECT date_trunc('month', br.borrow_date)::date AS month,
+                              br.book_id,
+                              member.category_id AS member_category_id,
+                              br.status,
+                              COUNT(*) AS borrowing_count,
+                              COUNT(*) FILTER (
+                                  WHERE br.status = 'overdue'
+                                     OR br.actual_return_date > br.expected_return_date
+                              ) AS overdue_count,
+                              COUNT(*) FILTER (WHERE br.extension_count > 0) AS extended_count,
+                              COALESCE(SUM(br.extension_count), 0) AS extension_count,
+                              COALESCE(%s, 0) AS fine_amount
+                         FROM library_borrowing_record br
+                         JOIN library_member member ON member.id = br.member_id
+                     GROUP BY 1, 2, 3, 4
+                   ) grouped
+        """, group_id, fines)
@@ -1,9 +1,12 @@
 from odoo import models, fields, api
+from odoo.tools import SQL
+from odoo.tools.sql import column_exists, create_column, table_exists
 from datetime import timedelta
 import uuid
 
 
 class BorrowingRecord(models.Model):
+    _name = 'library.borrowing.record'
     _inherit = ['library.borrowing.record', 'mail.thread', 'mail.activity.mixin', 'portal.mixin']
     
     # NEW fields for portal extension functionality:
@@ -16,7 +19,8 @@ class BorrowingRecord(models.Model):
     extension_count = fields.Integer(
         string='Extensions Granted', 
         default=0,
-        help='Number of extensions granted for this borrowing'
+        readonly=True,
+        help='Number of extensions granted for this borrowing, counted from the extension ledger'
     )
     can_request_extension = fields.Boolean(
         string='Can Request Extension',
@@ -28,45 +32,72 @@ class BorrowingRecord(models.Model):
         'borrowing_record_id',
         string='Extension Requests'
     )
+    extension_ledger_ids = fields.One2many(
+        'library.extension.ledger',
+        'borrowing_record_id',
+        string='Extension History'
+    )
     
     # Portal access fields
     access_token = fields.Char('Access Token', copy=False, groups='base.group_user')
     access_url = fields.Char('Portal Access URL', compute='_compute_access_url')
     
-    @api.depends('expected_return_date', 'extension_count', 'extension_request_ids.status', 'extension_request_ids.new_expiry_date')
+    def _auto_init(self):
+        """Create and seed the extension columns of existing tables in SQL.
+        
+        On a large database the ORM computation would load every borrowing at
+        once; one UPDATE seeds the columns instead, and the extension ledger
+        backfill cron only adds the counts of past approvals.
+        """
+        cr = self.env.cr
+        if table_exists(cr, self._table):
+            if not column_exists(cr, self._table, 'current_expiry_date'):
+                create_column(cr, self._table, 'current_expiry_date', 'date')
+                cr.execute(SQL(
+                    "UPDATE %s SET current_expiry_date = expected_return_date",
+                    SQL.identifier(self._table),
+                ))
+            if not column_exists(cr, self._table, 'extension_count'):
+                create_column(cr, self._table, 'extension_count', 'int4')
+                cr.execute(SQL("UPDATE %s SET extension_count = 0", SQL.identifier(self._table)))
+        return super()._auto_init()
+    
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Drop the cached portal counters of the members of new borrowings"""
+        records = super().create(vals_list)
+        self.env['library.member']._invalidate_portal_counters(records.member_id.ids)
+        return records
+    
+    def write(self, vals):
+        """Drop the cached portal counters of the members of changed borrowings"""
+        member_ids = set(self.member_id.ids)
+        result = super().write(vals)
+        if 'member_id' in vals:
+            member_ids.update(self.member_id.ids)
+        self.env['library.member']._invalidate_portal_counters(member_ids)
+        return result
+    
+    def unlink(self):
+        """Drop the cached portal counters of the members of removed borrowings"""
+        member_ids = self.member_id.ids
+        result = super().unlink()
+        self.env['library.member']._invalidate_portal_counters(member_ids)
+        return result
+    
+    @api.depends('expected_return_date')
     def _compute_current_expiry_date(self):
-        """Compute current expiry date based on approved extensions"""
+        """Current due date, moved by the extension ledger through expected_return_date"""
         for record in self:
-            # Default to expected return date
             record.current_expiry_date = record.expected_return_date
-            
-            if record.extension_count > 0 and record.extension_request_ids:
-                # Get the latest approved extension
-                approved_extensions = record.extension_request_ids.filtered(
-                    lambda r: r.status == 'approved'
-                ).sorted('review_date', reverse=True)
-                if approved_extensions and approved_extensions[0].new_expiry_date:
-                    record.current_expiry_date = approved_extensions[0].new_expiry_date
     
-    @api.depends('status', 'current_expiry_date', 'extension_count', 'extension_request_ids')
+    @api.depends('status', 'current_expiry_date', 'extension_count', 'extension_request_ids.status')
     def _compute_can_request_extension(self):
         """Check if extension can be requested"""
+        # One query for the whole recordset, shared with the portal routes
+        eligibility = self.env['library.extension.eligibility']._get_eligibility(self.filtered('id'))
         for record in self:
-            # Get configuration parameters
-            max_extensions = int(self.env['ir.config_parameter'].sudo().get_param(
-                'book_borrower_portal.max_extensions', 2))
-            min_days_before_expiry = int(self.env['ir.config_parameter'].sudo().get_param(
-                'book_borrower_portal.min_days_before_expiry', 3))
-            
-            # Check all conditions
-            can_request = (
-                record.status == 'borrowed' and  # Must be currently borrowed
-                record.current_expiry_date >= fields.Date.today() and  # Not overdue
-                record.extension_count < max_extensions and  # Haven't exceeded max extensions
-                (record.current_expiry_date - fields.Date.today()).days <= min_days_before_expiry and  # Within request window
-                not record.extension_request_ids.filtered(lambda r: r.status == 'pending')  # No pending requests
-            )
-            record.can_request_extension = can_request
+            record.can_request_extension = eligibility.get(record.id, {}).get('reason') == 'eligible'
     
     def _compute_access_url(self):
         """Compute portal access URL"""
@@ -0,0 +1,77 @@
+from odoo import models, api
+from odoo.tools.sql import escape_psql
+
+# Status filters of the portal borrowed books list
+SEARCH_STATUS_FILTERS = {
+    'all': None,
+    'borrowed': 'borrowed',
+    'overdue': 'overdue',
+    'returned': 'returned',
+}
+
+
+class LibraryBorrowingSearch(models.AbstractModel):
+    _name = 'library.borrowing.search'
+    _description = 'Library Borrowing History Search'
+    
+    @api.model
+    def _get_search_domain(self, query):
+        """ORM domain matching query against the book title, author or ISBN"""
+        return [
+            '|', '|',
+            ('book_id.title', 'ilike', query),
+            ('book_id.author', 'ilike', query),
+            ('book_id.isbn', 'ilike', query),
+        ]
+    
+    @api.model
+    def _search_history(self, member, query, filterby='all', limit=20, offset=0):
+        """Rank a member's borrowing records by how well their book matches query.
+        
+        Returns (borrowing records ordered by relevance, whether more results exist).
+        Ranking uses pg_trgm word similarity when available; otherwise results fall
+        back to the indexed ilike domain in record order.
+        """
+        query = (query or '').strip()
+        status = SEARCH_STATUS_FILTERS.get(filterby)
+        BorrowingRecord = self.env['library.borrowing.record']
+        if not query:
+            return BorrowingRecord, False
+        
+        if not self.env.registry.has_trigram:
+            domain = [('member_id', '=', member.id)] + self._get_search_domain(query)
+            if status:
+                domain += [('status', '=', status)]
+            records = BorrowingRecord.search(domain, order='sequence desc', limit=limit + 1, offset=offset)
+            return records[:limit], len(records) > limit
+        
+        BorrowingRecord.flush_model(['member_id', 'book_id', 'status', 'sequence'])
+        self.env['library.book'].flush_model(['title', 'author', 'isbn'])
+        self.env.cr.execute("""
+            SELECT br.id
+              FROM library_borrowing_record br
+              JOIN library_book book ON book.id = br.book_id
+             WHERE br.member_id = %(member_id)s
+               AND (%(status)s IS NULL OR br.status = %(status)s)
+               AND (book.title ILIKE %(pattern)s
+                    OR book.author ILIKE %(pattern)s
+                    OR book.isbn ILIKE %(pattern)s
+                    OR %(query)s <%% book.title)
+          ORDER BY GREATEST(
+                       word_similarity(%(query)s, COALESCE(book.title, '')),
+                       word_similarity(%(query)s, COALESCE(book.author, '')),
+                       CASE WHEN book.isbn ILIKE %(pattern)s THEN 1 ELSE 0 END
+                   ) DESC,
+                   br.sequence DESC, br.id DESC
+             LIMIT %(limit)s
+            OFFSET %(offset)s
+        """, {
+            'member_id': member.id,
+            'status': status,
+            'query': query,
+            'pattern': f'%{escape_psql(query)}%',
+            'limit': limit + 1,
+            'offset': offset,
+        })
+        ids = [row[0] for row in self.env.cr.fetchall()]
+        return BorrowingRecord.browse(ids[:limit]), len(ids) > limit
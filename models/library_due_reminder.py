@@ -0,0 +1,130 @@
+from odoo import models, fields, api
+from odoo.tools.sql import index_exists
+from datetime import timedelta
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Partial index of the borrowings still out, by due date
+DUE_BORROWINGS_INDEX = 'library_borrowing_record_due_date_idx'
+
+
+class LibraryDueReminder(models.Model):
+    _name = 'library.due.reminder'
+    _description = 'Library Due Date Reminder'
+    _order = 'reminder_date desc, id desc'
+    
+    # Members handled per committed batch
+    BATCH_SIZE = 500
+    DEFAULT_REMINDER_DAYS = '3,1,0'
+    
+    member_id = fields.Many2one(
+        'library.member',
+        string='Member',
+        required=True,
+        ondelete='cascade'
+    )
+    reminder_date = fields.Date(string='Reminder Date', required=True, index=True)
+    borrowing_record_ids = fields.Many2many(
+        'library.borrowing.record',
+        string='Borrowings Due'
+    )
+    borrowing_count = fields.Integer(string='Books', readonly=True)
+    
+    _sql_constraints = [
+        ('member_date_unique', 'unique(member_id, reminder_date)',
+         'A member receives at most one reminder digest per day.'),
+    ]
+    
+    def init(self):
+        """Index the borrowings still out by due date for the daily lookup"""
+        super().init()
+        if not index_exists(self.env.cr, DUE_BORROWINGS_INDEX):
+            self.env.cr.execute(f"""
+                CREATE INDEX {DUE_BORROWINGS_INDEX}
+                    ON library_borrowing_record (expected_return_date, member_id)
+                 WHERE status = 'borrowed' AND actual_return_date IS NULL
+            """)
+    
+    @api.model
+    def _get_reminder_days(self):
+        """Days before the due date at which members are reminded, e.g. [3, 1, 0]"""
+        value = self.env['ir.config_parameter'].sudo().get_param(
+            'book_borrower_portal.reminder_days', self.DEFAULT_REMINDER_DAYS)
+        days = set()
+        for part in (value or '').split(','):
+            try:
+                days.add(int(part))
+            except ValueError:
+                continue
+        return sorted(day for day in days if day >= 0)
+    
+    @api.model
+    def _find_due_borrowings(self, reminder_date, due_dates, limit):
+        """Return [(member id, [borrowing ids])] of members not reminded yet on reminder_date"""
+        self.env['library.borrowing.record'].flush_model(['status', 'expected_return_date', 'member_id'])
+        self.flush_model(['member_id', 'reminder_date'])
+        self.env.cr.execute("""
+            SELECT br.member_id, ARRAY_AGG(br.id ORDER BY br.expected_return_date, br.id)
+              FROM library_borrowing_record br
+              JOIN library_member member ON member.id = br.member_id
+             WHERE br.status = 'borrowed'
+               AND br.actual_return_date IS NULL
+               AND br.expected_return_date = ANY(%(due_dates)s::date[])
+               AND COALESCE(member.email, '') <> ''
+               AND NOT EXISTS (
+                       SELECT 1
+                         FROM library_due_reminder reminder
+                        WHERE reminder.member_id = br.member_id
+                          AND reminder.reminder_date = %(reminder_date)s
+                   )
+          GROUP BY br.member_id
+          ORDER BY br.member_id
+             LIMIT %(limit)s
+        """, {'due_dates': due_dates, 'reminder_date': reminder_date, 'limit': limit})
+        return self.env.cr.fetchall()
+    
+    def _send_digests(self):
+        """Send the digest of each reminder through its mail template"""
+        template = self.env.ref('book_borrower_portal.due_date_reminder_email', raise_if_not_found=False)
+        if not template or not self:
+            return
+        mode = self.env['ir.config_parameter'].sudo().get_param('book_borrower_portal.notification_mode', 'sync')
+        if mode == 'queue':
+            self.env['library.notification.outbox']._enqueue(template, self)
+        else:
+            # Mails are queued for the mail cron in this transaction, together with the sent log
+            template.sudo().send_mail_batch(self.ids, force_send=False)
+    
+    @api.model
+    def _cron_send_reminders(self):
+        """Send one due date digest per member and day.
+        
+        Members are handled in committed batches. The reminder row is written in the
+        same transaction as its email, so a rerun skips members already reminded and
+        never sends a duplicate.
+        """
+        reminder_date = fields.Date.context_today(self)
+        reminder_days = self._get_reminder_days()
+        if not reminder_days:
+            return
+        due_dates = [reminder_date + timedelta(days=days) for days in reminder_days]
+        
+        sent = 0
+        while True:
+            due = self._find_due_borrowings(reminder_date, due_dates, self.BATCH_SIZE)
+            if not due:
+                break
+            reminders = self.sudo().create([{
+                'member_id': member_id,
+                'reminder_date': reminder_date,
+                'borrowing_record_ids': [(6, 0, borrowing_ids)],
+                'borrowing_count': len(borrowing_ids),
+            } for member_id, borrowing_ids in due])
+            reminders._send_digests()
+            sent += len(reminders)
+            self.env.cr.commit()
+            self.env.invalidate_all()
+        
+        _logger.info("Due date reminders for %s: %s digests sent", reminder_date, sent)
+        return sent
@@ -0,0 +1,66 @@
+from odoo import models, fields
+from odoo.tools import SQL
+
+
+class LibraryExtensionAnalysis(models.Model):
+    _name = 'library.extension.analysis'
+    _inherit = 'library.analytics.view'
+    _description = 'Library Extension Request Analysis'
+    _auto = False
+    _rec_name = 'month'
+    _order = 'month desc'
+    
+    _ratio_measures = {
+        'approval_rate': ('approved_count', 'decided_count', 100.0),
+        'avg_review_hours': ('review_hours', 'reviewed_count', 1.0),
+    }
+    
+    month = fields.Date(string='Month', readonly=True)
+    book_id = fields.Many2one('library.book', string='Book', readonly=True)
+    member_category_id = fields.Many2one('library.member.category', string='Member Category', readonly=True)
+    status = fields.Selection([
+        ('pending', 'Pending Review'),
+        ('approved', 'Approved'),
+        ('rejected', 'Rejected')
+    ], string='Status', readonly=True)
+    reviewed_by = fields.Many2one('library.librarian', string='Reviewed By', readonly=True)
+    auto_approved = fields.Boolean(string='Auto-Approved', readonly=True)
+    request_count = fields.Integer(string='Requests', readonly=True)
+    approved_count = fields.Integer(string='Approved', readonly=True)
+    rejected_count = fields.Integer(string='Rejected', readonly=True)
+    decided_count = fields.Integer(string='Decided', readonly=True)
+    reviewed_count = fields.Integer(string='Reviewed', readonly=True)
+    extension_days = fields.Integer(string='Days Requested', readonly=True)
+    review_hours = fields.Float(string='Review Time (h)', readonly=True)
+    approval_rate = fields.Float(string='Approval Rate (%)', readonly=True, aggregator='avg')
+    avg_review_hours = fields.Float(string='Avg. Review Latency (h)', readonly=True, aggregator='avg')
+    
+    def _query(self):
+        """Extension requests per month, book, member category, status and reviewer"""
+        group_id = self._group_id(
+            SQL("grouped.month"), SQL("grouped.book_id"), SQL("grouped.member_category_id"),
+            SQL("grouped.status"), SQL("grouped.reviewed_by"), SQL("grouped.auto_approved"))
+        return SQL("""
+            SELECT %s AS id,
+                   grouped.*,
+                   100.0 * grouped.approved_count / NULLIF(grouped.decided_count, 0) AS approval_rate,
+                   grouped.review_hours / NULLIF(grouped.reviewed_count, 0) AS avg_review_hours
+              FROM (
+                       SELECT date_trunc('month', req.request_date)::date AS month,
+                              req.book_id,
+                              member.category_id AS member_category_id,
+                              req.status,
+                              req.reviewed_by,
+                              req.auto_approval_rule_id IS NOT NULL AS auto_approved,
+                              COUNT(*) AS request_count,
+                              COUNT(*) FILTER (WHERE req.status = 'approved') AS approved_count,
+                              COUNT(*) FILTER (WHERE req.status = 'rejected') AS rejected_count,
+                              COUNT(*) FILTER (WHERE req.status IN ('approved', 'rejected')) AS decided_count,
+                              COUNT(req.review_date) AS reviewed_count,
+                              COALESCE(SUM(req.requested_expiry_date - req.original_expiry_date), 0) AS extension_days,
+                              COALESCE(SUM(EXTRACT(EPOCH FROM req.review_date - req.request_date) / 3600.0), 0) AS review_hours
+                         FROM library_extension_request req
+                         JOIN library_member member ON member.id = req.member_id
+                     GROUP BY 1, 2, 3, 4, 5, 6
+                   ) grouped
+        """, group_id)
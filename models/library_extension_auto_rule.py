@@ -0,0 +1,233 @@
+from odoo import models, fields, api
+from odoo.exceptions import ValidationError
+from odoo.tools.sql import column_exists
+from markupsafe import Markup
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+class LibraryExtensionAutoRule(models.Model):
+    _name = 'library.extension.auto.rule'
+    _description = 'Library Extension Auto-Approval Rule'
+    _order = 'sequence, id'
+    
+    # Pending requests evaluated per committed batch
+    BATCH_SIZE = 1000
+    
+    name = fields.Char(string='Rule', required=True, translate=True)
+    sequence = fields.Integer(default=10, help='Rules are tried in this order; the first matching rule fires')
+    active = fields.Boolean(default=True)
+    category_ids = fields.Many2many(
+        'library.member.category',
+        string='Member Categories',
+        help='Only apply to members of these categories; leave empty for all members'
+    )
+    max_previous_extensions = fields.Integer(
+        string='Max. Previous Extensions',
+        default=0,
+        help='Approved extensions the borrowing may already have; 0 only approves first extensions'
+    )
+    max_extension_days = fields.Integer(
+        string='Max. Extension (Days)',
+        default=0,
+        help='Longest extension approved by this rule; 0 uses the maximum of the extension policy'
+    )
+    require_no_overdue = fields.Boolean(
+        string='No Overdue Books',
+        default=True,
+        help='Only approve when the member has no overdue borrowing'
+    )
+    require_no_fines = fields.Boolean(
+        string='No Fines',
+        default=True,
+        help='Only approve when the member has no fines'
+    )
+    reviewer_id = fields.Many2one(
+        'library.librarian',
+        string='Approve As',
+        help='Librarian recorded as reviewer of the approved requests; defaults to the cron user'
+    )
+    request_ids = fields.One2many(
+        'library.extension.request',
+        'auto_approval_rule_id',
+        string='Approved Requests'
+    )
+    request_count = fields.Integer(string='Approved', compute='_compute_request_count')
+    
+    @api.constrains('max_previous_extensions', 'max_extension_days')
+    def _check_limits(self):
+        """Validate rule limits"""
+        for rule in self:
+            if rule.max_previous_extensions < 0 or rule.max_extension_days < 0:
+                raise ValidationError('Auto-approval limits cannot be negative.')
+    
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Let the new rules evaluate the requests left for librarian review"""
+        rules = super().create(vals_list)
+        self._requeue_pending_requests()
+        return rules
+    
+    def write(self, vals):
+        """Let the changed rules evaluate the requests left for librarian review"""
+        result = super().write(vals)
+        if set(vals) - {'name'}:
+            self._requeue_pending_requests()
+        return result
+    
+    @api.model
+    def _requeue_pending_requests(self):
+        """Put pending requests that matched no rule back in the auto-approval queue"""
+        Request = self.env['library.extension.request']
+        Request.flush_model(['status', 'auto_review_date'])
+        self.env.cr.execute("""
+            UPDATE library_extension_request
+               SET auto_review_date = NULL
+             WHERE status = 'pending'
+               AND auto_review_date IS NOT NULL
+        """)
+        if self.env.cr.rowcount:
+            Request.invalidate_model(['auto_review_date'])
+            self._trigger_auto_approval()
+    
+    def _compute_request_count(self):
+        """Count the requests approved by each rule in one grouped query"""
+        counts = dict(self.env['library.extension.request']._read_group(
+            [('auto_approval_rule_id', 'in', self.ids)], ['auto_approval_rule_id'], ['__count']))
+        for rule in self:
+            rule.request_count = counts.get(rule, 0)
+    
+    @api.model
+    def _fetch_queue(self, limit):
+        """Fetch the pending requests not evaluated yet, with what the rules check, in one query.
+        
+        Returns [(request id, extension days, approved extensions of the borrowing,
+        member category id, overdue borrowings of the member, fines of the member)].
+        """
+        self.env['library.extension.request'].flush_model([
+            'status', 'auto_review_date', 'borrowing_record_id', 'member_id', 'requested_expiry_date'])
+        self.env['library.borrowing.record'].flush_model()
+        self.env['library.member'].flush_model(['category_id'])
+        fines = 'br.fine_amount' if column_exists(self.env.cr, 'library_borrowing_record', 'fine_amount') else '0'
+        self.env.cr.execute(f"""
+            WITH queue AS (
+                SELECT id, borrowing_record_id, member_id, requested_expiry_date
+                  FROM library_extension_request
+                 WHERE status = 'pending'
+                   AND auto_review_date IS NULL
+              ORDER BY id
+                 LIMIT %(limit)s
+            )
+            SELECT queue.id,
+                   queue.requested_expiry_date - borrowing.current_expiry_date,
+                   COALESCE(borrowing.extension_count, 0),
+                   member.category_id,
+                   COALESCE(stats.overdue_count, 0),
+                   COALESCE(stats.fines, 0)
+              FROM queue
+              -- Due date and extension count are maintained by the extension ledger
+              JOIN library_borrowing_record borrowing ON borrowing.id = queue.borrowing_record_id
+              JOIN library_member member ON member.id = queue.member_id
+         LEFT JOIN (
+                       SELECT br.member_id,
+                              COUNT(*) FILTER (
+                                  WHERE br.status = 'overdue'
+                                     OR (br.status = 'borrowed' AND br.actual_return_date IS NULL
+                                         AND br.current_expiry_date < %(today)s)
+                              ) AS overdue_count,
+                              SUM({fines}) AS fines
+                         FROM library_borrowing_record br
+                        WHERE br.member_id IN (SELECT member_id FROM queue)
+                     GROUP BY br.member_id
+                   ) stats ON stats.member_id = queue.member_id
+          ORDER BY queue.id
+        """, {'limit': limit, 'today': fields.Date.context_today(self)})
+        return self.env.cr.fetchall()
+    
+    def _matches(self, policy, extension_days, previous_count, category_id, overdue_count, fines):
+        """Whether a queued request satisfies this rule and the member's extension policy"""
+        self.ensure_one()
+        max_extension_days = min(self.max_extension_days or policy.max_extension_days, policy.max_extension_days)
+        return (
+            (not self.category_ids or category_id in self.category_ids.ids)
+            and previous_count <= self.max_previous_extensions
+            and previous_count < policy.max_extensions
+            and extension_days is not None
+            and 0 < extension_days <= max_extension_days
+            and not (self.require_no_overdue and overdue_count)
+            and not (self.require_no_fines and fines > 0)
+        )
+    
+    @api.model
+    def _evaluate_queue(self, rules, rows):
+        """Assign each queued request to the first matching rule.
+        
+        Returns ({rule: [request ids]}, [request ids left to the librarians]).
+        """
+        Policy = self.env['library.extension.policy']
+        matched = {}
+        unmatched = []
+        for request_id, extension_days, previous_count, category_id, overdue_count, fines in rows:
+            # Policies are cached per category, so this costs no query
+            policy = Policy._get_policy(category_id or False)
+            rule = next((rule for rule in rules
+                         if rule._matches(policy, extension_days, previous_count, category_id, overdue_count, fines)),
+                        None)
+            if rule:
+                matched.setdefault(rule, []).append(request_id)
+            else:
+                unmatched.append(request_id)
+        return matched, unmatched
+    
+    def _approve(self, requests):
+        """Approve requests on behalf of this rule and log the rule on each of them"""
+        self.ensure_one()
+        approved, failures = requests.with_context(
+            default_librarian_id=self.reviewer_id.id or False)._approve_requests()
+        if approved:
+            approved.write({'auto_approval_rule_id': self.id})
+            body = Markup('Automatically approved by rule <b>%s</b>.') % self.name
+            approved._message_log_batch(bodies={request.id: body for request in approved})
+        for failed, error in failures.items():
+            _logger.warning("Auto-approval of %s by rule %s failed: %s",
+                            ', '.join(failed.mapped('name')), self.name, error)
+        return approved
+    
+    @api.model
+    def _cron_auto_approve(self):
+        """Evaluate the pending extension queue against the active rules.
+        
+        Each batch is read with one query and matched in memory; matching requests
+        are approved in bulk per rule and the others are marked as evaluated so
+        they stay in the librarian queue. Batches are committed one by one.
+        """
+        rules = self.search([])
+        Request = self.env['library.extension.request']
+        approved_count = left_count = 0
+        while rules:
+            rows = self._fetch_queue(self.BATCH_SIZE)
+            if not rows:
+                break
+            matched, unmatched = self._evaluate_queue(rules, rows)
+            for rule, request_ids in matched.items():
+                approved = rule._approve(Request.browse(request_ids))
+                approved_count += len(approved)
+                left_count += len(request_ids) - len(approved)
+            left_count += len(unmatched)
+            
+            # Requests that failed or matched no rule wait for a librarian
+            Request.browse([row[0] for row in rows]).write({'auto_review_date': fields.Datetime.now()})
+            self.env.cr.commit()
+            self.env.invalidate_all()
+        
+        _logger.info("Extension auto-approval: %s requests approved, %s left for librarian review",
+                     approved_count, left_count)
+        return approved_count
+    
+    @api.model
+    def _trigger_auto_approval(self):
+        """Run the auto-approval cron soon after new requests are submitted"""
+        cron = self.sudo().env.ref('book_borrower_portal.ir_cron_auto_approve_extensions', raise_if_not_found=False)
+        if cron and cron.active and self.sudo().search_count([], limit=1):
+            cron._trigger()
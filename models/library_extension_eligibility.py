@@ -0,0 +1,90 @@
+from odoo import models, fields, api
+
+# Reason codes returned by the eligibility service, and their portal messages
+ELIGIBLE = 'eligible'
+ELIGIBILITY_REASONS = {
+    ELIGIBLE: 'An extension can be requested.',
+    'not_borrowed': 'This book is not currently borrowed.',
+    'overdue': 'This book is overdue. Extensions cannot be requested for overdue books.',
+    'max_extensions': 'The maximum number of extensions has been reached for this borrowing.',
+    'too_early': 'Extensions can only be requested close to the due date.',
+    'pending_request': 'There is already a pending extension request for this borrowing record. Please wait for it to be processed.',
+}
+
+
+class LibraryExtensionEligibility(models.AbstractModel):
+    _name = 'library.extension.eligibility'
+    _description = 'Library Extension Eligibility'
+    
+    @api.model
+    def _fetch_eligibility_data(self, borrowing_ids):
+        """Fetch status, current expiry, extension count and pending request of borrowings in one query"""
+        self.env['library.borrowing.record'].flush_model(['status', 'current_expiry_date', 'extension_count', 'member_id'])
+        self.env['library.extension.request'].flush_model(['borrowing_record_id', 'status'])
+        self.env['library.member'].flush_model(['category_id'])
+        # Due date and extension count are maintained on the borrowing by the extension ledger
+        self.env.cr.execute("""
+            SELECT br.id,
+                   br.status,
+                   br.current_expiry_date,
+                   COALESCE(br.extension_count, 0),
+                   pending.id,
+                   member.category_id
+              FROM library_borrowing_record br
+              JOIN library_member member ON member.id = br.member_id
+         LEFT JOIN LATERAL (
+                       SELECT id
+                         FROM library_extension_request
+                        WHERE borrowing_record_id = br.id
+                          AND status = 'pending'
+                     ORDER BY id
+                        LIMIT 1
+                   ) pending ON TRUE
+             WHERE br.id = ANY(%s)
+        """, [list(borrowing_ids)])
+        return self.env.cr.fetchall()
+    
+    @api.model
+    def _get_eligibility(self, borrowing_records):
+        """Evaluate extension eligibility of a set of borrowing records.
+        
+        Returns {borrowing id: {'reason': code, 'expiry_date': date, 'extension_count': int,
+        'pending_request_id': int or False}}, where code is one of ELIGIBILITY_REASONS.
+        """
+        if not borrowing_records:
+            return {}
+        
+        Policy = self.env['library.extension.policy']
+        today = fields.Date.context_today(self)
+        result = {}
+        for borrowing_id, status, expiry_date, extension_count, pending_id, category_id in \
+                self._fetch_eligibility_data(borrowing_records.ids):
+            # Policies are cached per category, so this costs no query
+            policy = Policy._get_policy(category_id or False)
+            
+            # Checks in the order a member should be told about them
+            if status != 'borrowed':
+                reason = 'not_borrowed'
+            elif expiry_date < today:
+                reason = 'overdue'
+            elif pending_id:
+                reason = 'pending_request'
+            elif extension_count >= policy.max_extensions:
+                reason = 'max_extensions'
+            elif (expiry_date - today).days > policy.min_days_before_expiry:
+                reason = 'too_early'
+            else:
+                reason = ELIGIBLE
+            
+            result[borrowing_id] = {
+                'reason': reason,
+                'expiry_date': expiry_date,
+                'extension_count': extension_count,
+                'pending_request_id': pending_id or False,
+            }
+        return result
+    
+    @api.model
+    def _get_reason_message(self, reason):
+        """Human readable message of a reason code"""
+        return ELIGIBILITY_REASONS.get(reason, '')
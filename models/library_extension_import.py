@@ -0,0 +1,290 @@
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+from itertools import islice
+import codecs
+import csv
+import io
+import json
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+class LibraryExtensionImport(models.Model):
+    _name = 'library.extension.import'
+    _description = 'Library Extension Request Import'
+    _order = 'create_date desc'
+    
+    # Rows are created CHUNK_SIZE at a time; a cron run handles at most CHUNKS_PER_RUN chunks
+    CHUNK_SIZE = 1000
+    CHUNKS_PER_RUN = 10
+    MAX_LOGGED_ERRORS = 200
+    # Bytes read from the file at a time when streaming JSON
+    READ_SIZE = 64 * 1024
+    
+    # File columns copied as is onto the extension requests
+    PLAIN_COLUMNS = [
+        'name', 'request_date', 'original_expiry_date', 'requested_expiry_date', 'request_reason',
+        'status', 'review_date', 'rejection_reason', 'new_expiry_date',
+    ]
+    
+    name = fields.Char(string='Import', required=True)
+    file = fields.Binary(string='File', required=True, attachment=True)
+    file_name = fields.Char(string='File Name')
+    file_type = fields.Selection([
+        ('csv', 'CSV'),
+        ('json', 'JSON')
+    ], string='File Type', default='csv', required=True,
+        help='CSV with a header row, or JSON as an array or one object per line')
+    state = fields.Selection([
+        ('draft', 'Draft'),
+        ('pending', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed')
+    ], string='Status', default='draft', required=True, index=True)
+    row_count = fields.Integer(string='Rows', readonly=True)
+    processed_count = fields.Integer(string='Processed Rows', readonly=True,
+                                     help='Rows handled so far')
+    file_offset = fields.Integer(string='Checkpoint', readonly=True,
+                                 help='Byte offset in the file after the rows handled so far; the import resumes from here')
+    imported_count = fields.Integer(string='Imported', readonly=True)
+    failed_count = fields.Integer(string='Failed', readonly=True)
+    progress = fields.Float(string='Progress', compute='_compute_progress')
+    error_log = fields.Text(string='Errors', readonly=True)
+    
+    @api.depends('row_count', 'processed_count')
+    def _compute_progress(self):
+        """Share of the rows handled so far"""
+        for job in self:
+            job.progress = 100.0 * job.processed_count / job.row_count if job.row_count else 0.0
+    
+    def _open_file(self):
+        """Binary file object of the uploaded file, read from the filestore when possible"""
+        self.ensure_one()
+        attachment = self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', self._name),
+            ('res_field', '=', 'file'),
+            ('res_id', '=', self.id),
+        ], limit=1)
+        if not attachment:
+            raise UserError('Please upload a file to import.')
+        if attachment.store_fname:
+            return open(attachment._full_path(attachment.store_fname), 'rb')
+        return io.BytesIO(attachment.raw)
+    
+    def _iter_rows(self, offset=0):
+        """Yield (row as a dict, byte offset after the row), streamed from offset on"""
+        self.ensure_one()
+        with self._open_file() as binary:
+            if self.file_type == 'csv':
+                yield from self._iter_csv_rows(binary, offset)
+            else:
+                yield from self._iter_json_rows(binary, offset)
+    
+    def _iter_csv_rows(self, binary, offset):
+        """Stream CSV rows; the header is read again from the start of the file"""
+        header_line = binary.readline()
+        header = next(csv.reader([header_line.decode('utf-8-sig')]), None)
+        if not header:
+            return
+        binary.seek(max(offset, len(header_line)))
+        position = [binary.tell()]
+        
+        def lines():
+            # The csv reader pulls a line only when its current row needs it, so
+            # position is the end of the last row once that row is yielded
+            for line in iter(binary.readline, b''):
+                position[0] += len(line)
+                yield line.decode('utf-8')
+        
+        for values in csv.reader(lines()):
+            if values:
+                yield dict(zip(header, values)), position[0]
+    
+    def _iter_json_rows(self, binary, offset):
+        """Stream the objects of a JSON array or of JSON Lines, one at a time"""
+        binary.seek(offset)
+        decoder = json.JSONDecoder()
+        reader = codecs.getincrementaldecoder('utf-8-sig')()
+        buffer = ''
+        position = offset
+        eof = False
+        while True:
+            # Array brackets, separators and blank lines between objects are skipped
+            stripped = buffer.lstrip(' \t\r\n,[]')
+            position += len(buffer[:len(buffer) - len(stripped)].encode('utf-8'))
+            buffer = stripped
+            try:
+                row, end = decoder.raw_decode(buffer) if buffer else (None, 0)
+            except ValueError:
+                if eof:
+                    raise
+                end = 0
+            if end and (eof or end < len(buffer)):
+                position += len(buffer[:end].encode('utf-8'))
+                buffer = buffer[end:]
+                yield row, position
+                continue
+            if eof:
+                return
+            data = binary.read(self.READ_SIZE)
+            eof = not data
+            buffer += reader.decode(data, final=eof)
+    
+    def _prepare_chunk_values(self, rows):
+        """Convert file rows into create values, resolving references in one query per chunk.
+        
+        Returns a list of (row number, values or None, error or None).
+        """
+        borrowing_refs = {str(row.get('borrowing_record') or '').strip() for _number, row in rows}
+        reviewer_refs = {str(row.get('reviewed_by') or '').strip() for _number, row in rows} - {''}
+        
+        # Borrowing records are referenced by their record number (sequence) or database id
+        BorrowingRecord = self.env['library.borrowing.record'].sudo()
+        borrowings = {}
+        for record in BorrowingRecord.search_fetch(
+                ['|', ('sequence', 'in', list(borrowing_refs)),
+                 ('id', 'in', [int(ref) for ref in borrowing_refs if ref.isdigit()])],
+                ['sequence']):
+            borrowings[str(record.id)] = record.id
+            borrowings[record.sequence] = record.id
+        reviewers = {
+            librarian.employee_id: librarian.id
+            for librarian in self.env['library.librarian'].sudo().search_fetch(
+                [('employee_id', 'in', list(reviewer_refs))], ['employee_id'])
+        } if reviewer_refs else {}
+        
+        prepared = []
+        for number, row in rows:
+            borrowing_ref = str(row.get('borrowing_record') or '').strip()
+            reviewer_ref = str(row.get('reviewed_by') or '').strip()
+            if borrowing_ref not in borrowings:
+                prepared.append((number, None, f'Unknown borrowing record "{borrowing_ref}"'))
+                continue
+            if reviewer_ref and reviewer_ref not in reviewers:
+                prepared.append((number, None, f'Unknown librarian "{reviewer_ref}"'))
+                continue
+            vals = {column: row[column] for column in self.PLAIN_COLUMNS if row.get(column) not in (None, '')}
+            vals['borrowing_record_id'] = borrowings[borrowing_ref]
+            if reviewer_ref:
+                vals['reviewed_by'] = reviewers[reviewer_ref]
+            prepared.append((number, vals, None))
+        return prepared
+    
+    @api.model
+    def _create_requests(self, Request, vals_list):
+        """Create requests, recording imported approvals in the extension ledger"""
+        requests = Request.create(vals_list)
+        approved = requests.filtered(lambda request: request.status == 'approved')
+        if approved:
+            # Moves the due dates and counts the extensions like a live approval
+            self.env['library.extension.ledger'].sudo()._record_approvals(approved)
+        return requests
+    
+    def _import_chunk(self, rows):
+        """Create the requests of a chunk, isolating failing rows when the batch fails.
+        
+        Returns (number of imported rows, [error lines]).
+        """
+        # Historical data: no chatter messages or tracking on the created requests
+        Request = self.env['library.extension.request'].with_context(
+            tracking_disable=True, mail_create_nolog=True, mail_notrack=True)
+        prepared = self._prepare_chunk_values(rows)
+        errors = [f'Row {number}: {error}' for number, _vals, error in prepared if error]
+        valid = [(number, vals) for number, vals, error in prepared if not error]
+        if not valid:
+            return 0, errors
+        
+        try:
+            with self.env.cr.savepoint():
+                self._create_requests(Request, [vals for _number, vals in valid])
+            return len(valid), errors
+        except Exception:
+            # Fall back to one savepoint per row to find the culprits
+            pass
+        
+        imported = 0
+        for number, vals in valid:
+            try:
+                with self.env.cr.savepoint():
+                    self._create_requests(Request, [vals])
+                imported += 1
+            except Exception as e:
+                errors.append(f'Row {number}: {e}')
+        return imported, errors
+    
+    def _process(self, max_chunks=None):
+        """Import the next chunks of the file, resuming at the byte offset checkpoint.
+        
+        Each chunk is imported and checkpointed in its own savepoint, so a failing
+        chunk does not roll back the chunks imported before it.
+        """
+        self.ensure_one()
+        if self.state in ('draft', 'pending'):
+            self.write({
+                'state': 'running',
+                'row_count': sum(1 for _row in self._iter_rows()),
+            })
+        
+        rows = enumerate(self._iter_rows(self.file_offset), start=self.processed_count + 1)
+        chunks_done = 0
+        while max_chunks is None or chunks_done < max_chunks:
+            chunk = list(islice(rows, self.CHUNK_SIZE))
+            if not chunk:
+                break
+            with self.env.cr.savepoint():
+                imported, errors = self._import_chunk([(number, row) for number, (row, _offset) in chunk])
+                error_lines = (self.error_log or '').splitlines()
+                self.write({
+                    'processed_count': self.processed_count + len(chunk),
+                    'file_offset': chunk[-1][1][1],
+                    'imported_count': self.imported_count + imported,
+                    'failed_count': self.failed_count + len(chunk) - imported,
+                    'error_log': '\n'.join((error_lines + errors)[:self.MAX_LOGGED_ERRORS]) or False,
+                })
+            chunks_done += 1
+            _logger.info("Extension request import %s: %s/%s rows processed",
+                         self.name, self.processed_count, self.row_count)
+            # Keep memory flat: drop the records of the imported chunk from the cache
+            self.env['library.extension.request'].invalidate_model()
+            self.env['library.borrowing.record'].invalidate_model()
+        
+        if self.processed_count >= self.row_count:
+            self.state = 'done'
+        return chunks_done
+    
+    @api.model
+    def _cron_run_imports(self):
+        """Import queued files chunk by chunk, reporting progress to the cron runner"""
+        job = self.search([('state', 'in', ('pending', 'running'))], order='id', limit=1)
+        if not job:
+            return
+        processed_before = job.processed_count
+        try:
+            job._process(max_chunks=self.CHUNKS_PER_RUN)
+        except Exception as e:
+            # Chunks checkpointed before the failure are kept
+            _logger.warning("Extension request import %s failed: %s", job.name, e)
+            job.write({
+                'state': 'failed',
+                'error_log': '\n'.join(filter(None, [job.error_log, str(e)])),
+            })
+        
+        # The cron runner commits and calls again while rows remain
+        unfinished = self.search([('state', 'in', ('pending', 'running'))])
+        remaining = sum(
+            job.row_count - job.processed_count if job.state == 'running' else 1
+            for job in unfinished
+        )
+        self.env['ir.cron']._notify_progress(done=job.processed_count - processed_before, remaining=remaining)
+    
+    def action_start(self):
+        """Queue the import for the background worker"""
+        for job in self:
+            if not job.file:
+                raise UserError('Please upload a file to import.')
+        self.filtered(lambda job: job.state in ('draft', 'failed')).write({'state': 'pending'})
+        cron = self.env.ref('book_borrower_portal.ir_cron_run_extension_imports', raise_if_not_found=False)
+        if cron:
+            cron.sudo()._trigger()
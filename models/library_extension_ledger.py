@@ -0,0 +1,198 @@
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+from collections import Counter, defaultdict
+import logging
+import time
+
+_logger = logging.getLogger(__name__)
+
+# Last borrowing record id handled by the backfill, or 'done'
+BACKFILL_PARAM = 'book_borrower_portal.extension_ledger_backfill'
+
+
+class LibraryExtensionLedger(models.Model):
+    _name = 'library.extension.ledger'
+    _description = 'Library Extension Ledger'
+    _order = 'entry_date desc, id desc'
+    
+    # Borrowing records per committed backfill chunk, and seconds a cron run may spend
+    CHUNK_SIZE = 5000
+    TIME_BUDGET = 240
+    
+    borrowing_record_id = fields.Many2one(
+        'library.borrowing.record',
+        string='Borrowing Record',
+        required=True,
+        index=True,
+        ondelete='cascade'
+    )
+    request_id = fields.Many2one(
+        'library.extension.request',
+        string='Extension Request',
+        ondelete='set null'
+    )
+    librarian_id = fields.Many2one('library.librarian', string='Approved By')
+    entry_date = fields.Datetime(string='Date', required=True, default=fields.Datetime.now)
+    previous_expiry_date = fields.Date(string='Previous Due Date')
+    new_expiry_date = fields.Date(string='New Due Date', required=True)
+    
+    _sql_constraints = [
+        ('request_unique', 'unique(request_id)',
+         'An extension request is recorded in the ledger only once.'),
+    ]
+    
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Apply new entries to their borrowing records"""
+        entries = super().create(vals_list)
+        entries._apply_to_borrowings()
+        return entries
+    
+    def write(self, vals):
+        """Ledger entries are append-only"""
+        raise UserError('Extension ledger entries cannot be modified.')
+    
+    def unlink(self):
+        """Ledger entries are append-only"""
+        raise UserError('Extension ledger entries cannot be deleted.')
+    
+    def _apply_to_borrowings(self):
+        """Move the due date of the borrowing records and count their extensions.
+        
+        Due dates are written with one write per target date, the latest entry of
+        a borrowing winning, also over older entries recorded before (imported
+        history may arrive out of order); extension counters are incremented in
+        SQL so concurrent approvals never overwrite each other.
+        """
+        BorrowingRecord = self.env['library.borrowing.record'].sudo()
+        latest = {}
+        for entry in self.sorted(lambda entry: (entry.entry_date, entry.id)):
+            latest[entry.borrowing_record_id.id] = (entry.entry_date, entry.new_expiry_date)
+        self.flush_model(['borrowing_record_id', 'entry_date'])
+        self.env.cr.execute("""
+            SELECT borrowing_record_id, MAX(entry_date)
+              FROM library_extension_ledger
+             WHERE borrowing_record_id = ANY(%s)
+               AND id != ALL(%s)
+          GROUP BY borrowing_record_id
+        """, [list(latest), self.ids])
+        recorded = dict(self.env.cr.fetchall())
+        by_date = defaultdict(list)
+        for borrowing_id, (entry_date, expiry_date) in latest.items():
+            if borrowing_id not in recorded or recorded[borrowing_id] <= entry_date:
+                by_date[expiry_date].append(borrowing_id)
+        for expiry_date, borrowing_ids in by_date.items():
+            BorrowingRecord.browse(borrowing_ids).write({'expected_return_date': expiry_date})
+        
+        counts = Counter(entry.borrowing_record_id.id for entry in self)
+        BorrowingRecord.flush_model(['extension_count'])
+        self.env.cr.execute("""
+            UPDATE library_borrowing_record br
+               SET extension_count = COALESCE(br.extension_count, 0) + delta.entry_count
+              FROM (SELECT unnest(%s::int[]) AS id, unnest(%s::int[]) AS entry_count) AS delta
+             WHERE br.id = delta.id
+        """, [list(counts), list(counts.values())])
+        borrowings = BorrowingRecord.browse(list(counts))
+        borrowings.invalidate_recordset(['extension_count'])
+        # Let the fields depending on the counter, like the extension eligibility, recompute
+        borrowings.modified(['extension_count'])
+    
+    @api.model
+    def _record_approvals(self, requests):
+        """Append one entry per approved request, live or imported"""
+        return self.create([{
+            'borrowing_record_id': request.borrowing_record_id.id,
+            'request_id': request.id,
+            'librarian_id': request.reviewed_by.id,
+            'entry_date': request.review_date or fields.Datetime.now(),
+            'previous_expiry_date': request.borrowing_record_id.expected_return_date,
+            'new_expiry_date': request.new_expiry_date or request.requested_expiry_date,
+        } for request in requests])
+    
+    @api.model
+    def _backfill_chunk(self, last_id):
+        """Record the past approvals of the next chunk of borrowings.
+        
+        Returns the borrowing record ids handled.
+        """
+        cr = self.env.cr
+        cr.execute("""
+            SELECT id
+              FROM library_borrowing_record
+             WHERE id > %s
+          ORDER BY id
+             LIMIT %s
+        """, [last_id, self.CHUNK_SIZE])
+        ids = [row[0] for row in cr.fetchall()]
+        if not ids:
+            return ids
+        
+        # Approved requests not in the ledger yet, chained per borrowing in review order.
+        # The due dates already include them, only the counters are behind.
+        cr.execute("""
+            WITH inserted AS (
+                INSERT INTO library_extension_ledger (
+                    borrowing_record_id, request_id, librarian_id, entry_date,
+                    previous_expiry_date, new_expiry_date,
+                    create_uid, create_date, write_uid, write_date
+                )
+                SELECT req.borrowing_record_id,
+                       req.id,
+                       req.reviewed_by,
+                       COALESCE(req.review_date, req.write_date),
+                       COALESCE(LAG(req.new_expiry_date) OVER chain, req.original_expiry_date),
+                       req.new_expiry_date,
+                       %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+                  FROM library_extension_request req
+                 WHERE req.borrowing_record_id = ANY(%(ids)s)
+                   AND req.status = 'approved'
+                   AND req.new_expiry_date IS NOT NULL
+                   AND NOT EXISTS (SELECT 1 FROM library_extension_ledger ledger WHERE ledger.request_id = req.id)
+                WINDOW chain AS (PARTITION BY req.borrowing_record_id ORDER BY req.review_date NULLS FIRST, req.id)
+             RETURNING borrowing_record_id
+            )
+            UPDATE library_borrowing_record br
+               SET extension_count = COALESCE(br.extension_count, 0) + delta.entry_count
+              FROM (SELECT borrowing_record_id, COUNT(*) AS entry_count FROM inserted GROUP BY borrowing_record_id) delta
+             WHERE br.id = delta.borrowing_record_id
+        """, {'ids': ids, 'uid': self.env.uid})
+        return ids
+    
+    @api.model
+    def _cron_backfill(self):
+        """Fill the ledger of an existing database with its past approvals.
+        
+        Borrowing records are handled in committed chunks of increasing id, and the
+        checkpoint is committed with each chunk, so an interrupted run resumes where
+        it stopped. The cron deactivates itself once every record is done.
+        """
+        ICP = self.env['ir.config_parameter'].sudo()
+        checkpoint = ICP.get_param(BACKFILL_PARAM, '0')
+        if checkpoint == 'done':
+            self.env['ir.cron']._notify_progress(done=0, remaining=0, deactivate=True)
+            return
+        
+        last_id = int(checkpoint)
+        self.env['library.extension.request'].flush_model()
+        self.env['library.borrowing.record'].flush_model()
+        self.flush_model()
+        started = time.monotonic()
+        processed = 0
+        while time.monotonic() - started < self.TIME_BUDGET:
+            ids = self._backfill_chunk(last_id)
+            if not ids:
+                ICP.set_param(BACKFILL_PARAM, 'done')
+                break
+            last_id = ids[-1]
+            processed += len(ids)
+            ICP.set_param(BACKFILL_PARAM, str(last_id))
+            self.env.cr.commit()
+        self.env['library.borrowing.record'].invalidate_model(['extension_count'])
+        self.invalidate_model()
+        
+        remaining = 0
+        if ICP.get_param(BACKFILL_PARAM) != 'done':
+            self.env.cr.execute("SELECT COUNT(*) FROM library_borrowing_record WHERE id > %s", [last_id])
+            remaining = self.env.cr.fetchone()[0]
+        _logger.info("Extension ledger backfill: %s borrowing records processed, %s remaining", processed, remaining)
+        self.env['ir.cron']._notify_progress(done=processed, remaining=remaining, deactivate=not remaining)
@@ -0,0 +1,68 @@
+from odoo import models, api, tools
+from collections import namedtuple
+
+# Typed, immutable view of the extension rules
+ExtensionPolicy = namedtuple('ExtensionPolicy', [
+    'max_extensions',
+    'min_days_before_expiry',
+    'extension_days',
+    'max_extension_days',
+])
+
+# Configuration parameter keys and their defaults
+POLICY_PARAMETERS = {
+    'max_extensions': ('book_borrower_portal.max_extensions', 2),
+    'min_days_before_expiry': ('book_borrower_portal.min_days_before_expiry', 3),
+    'extension_days': ('book_borrower_portal.extension_days', 14),
+    'max_extension_days': ('book_borrower_portal.max_extension_days', 14),
+}
+
+
+class LibraryExtensionPolicy(models.AbstractModel):
+    _name = 'library.extension.policy'
+    _description = 'Library Extension Policy'
+    
+    @api.model
+    def _get_policy(self, category_id=False):
+        """Return the extension policy of a member category (global if none)"""
+        write_date = False
+        if category_id:
+            write_date = self.env['library.member.category'].sudo().browse(category_id).write_date
+        return self._get_cached_policy(category_id, write_date)
+    
+    @api.model
+    @tools.ormcache('category_id', 'write_date')
+    def _get_cached_policy(self, category_id, write_date):
+        """Parse the extension policy once per registry.
+        
+        Keyed on the category write date, so editing a category only misses its
+        own entry; configuration parameter changes clear the registry cache.
+        """
+        if category_id:
+            category = self.env['library.member.category'].sudo().browse(category_id)
+            if category.exists() and category.override_extension_policy:
+                return ExtensionPolicy(
+                    max_extensions=category.max_extensions,
+                    min_days_before_expiry=category.min_days_before_expiry,
+                    extension_days=category.extension_days,
+                    max_extension_days=category.max_extension_days,
+                )
+        
+        ICP = self.env['ir.config_parameter'].sudo()
+        values = {}
+        for name, (key, default) in POLICY_PARAMETERS.items():
+            try:
+                values[name] = int(ICP.get_param(key, default))
+            except (TypeError, ValueError):
+                values[name] = default
+        return ExtensionPolicy(**values)
+    
+    @api.model
+    def _get_member_policy(self, member):
+        """Return the extension policy applying to a member"""
+        return self._get_policy(member.sudo().category_id.id or False)
+    
+    @api.model
+    def _get_member_policies(self, members):
+        """Return {member id: policy} for a recordset of members"""
+        return {member.id: self._get_member_policy(member) for member in members.sudo()}
\ No newline at end of file
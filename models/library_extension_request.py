@@ -1,5 +1,108 @@
 from odoo import models, fields, api
+from odoo.tools import SQL
+from odoo.tools.sql import column_exists, create_column, index_exists, table_exists
 from odoo.exceptions import UserError, ValidationError
+from datetime import date
+import logging
+import psycopg2
+
+_logger = logging.getLogger(__name__)
+
+# Partial unique index allowing a single pending request per borrowing record
+PENDING_REQUEST_INDEX = 'library_extension_request_one_pending_idx'
+
+# Composite indexes backing the portal lists: member filter, optional status filter,
+# then the sort key of each sort option with id as tie-breaker (as used by seek pagination)
+PORTAL_LIST_INDEXES = {
+    'library_borrowing_record_member_sequence_idx': ('library_borrowing_record', ['member_id', 'sequence', 'id']),
+    'library_borrowing_record_member_borrow_date_idx': ('library_borrowing_record', ['member_id', 'borrow_date', 'id']),
+    'library_borrowing_record_member_due_date_idx': ('library_borrowing_record', ['member_id', 'expected_return_date', 'id']),
+    'library_borrowing_record_member_book_title_idx': ('library_borrowing_record', ['member_id', 'book_title', 'id']),
+    'library_borrowing_record_member_status_sequence_idx': ('library_borrowing_record', ['member_id', 'status', 'sequence', 'id']),
+    'library_borrowing_record_member_status_borrow_date_idx': ('library_borrowing_record', ['member_id', 'status', 'borrow_date', 'id']),
+    'library_borrowing_record_member_status_due_date_idx': ('library_borrowing_record', ['member_id', 'status', 'expected_return_date', 'id']),
+    'library_borrowing_record_member_status_book_title_idx': ('library_borrowing_record', ['member_id', 'status', 'book_title', 'id']),
+    'library_extension_request_member_date_idx': ('library_extension_request', ['member_id', 'request_date', 'id']),
+    'library_extension_request_member_status_date_idx': ('library_extension_request', ['member_id', 'status', 'request_date DESC', 'id DESC']),
+    'library_extension_request_member_book_title_idx': ('library_extension_request', ['member_id', 'book_title', 'request_date DESC', 'id DESC']),
+    'library_extension_request_member_status_book_title_idx': ('library_extension_request', ['member_id', 'status', 'book_title', 'request_date DESC', 'id DESC']),
+}
+
+
+def create_portal_list_indexes(cr, concurrently=False):
+    """Create the missing portal list indexes, rebuilding any left invalid by an interrupted build.
+    
+    With concurrently=True the cursor must be in autocommit mode.
+    """
+    mode = 'CONCURRENTLY ' if concurrently else ''
+    for index_name, (table, columns) in PORTAL_LIST_INDEXES.items():
+        column_names = [column.split()[0] for column in columns]
+        if not all(column_exists(cr, table, column) for column in column_names):
+            _logger.warning("Skipping index %s: %s lacks one of the columns %s", index_name, table, column_names)
+            continue
+        cr.execute("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(%s)", [index_name])
+        row = cr.fetchone()
+        if row and row[0]:
+            continue
+        if row:
+            cr.execute(f'DROP INDEX {mode}{index_name}')
+        _logger.info("Creating index %s on %s", index_name, table)
+        cr.execute(f'CREATE INDEX {mode}{index_name} ON {table} ({", ".join(columns)})')
+
+
+# Full-text search: a generated tsvector column (book title weighted above the reasons)
+# maintained by PostgreSQL itself, and its GIN index
+TEXT_SEARCH_CONFIG = 'english'
+TEXT_SEARCH_COLUMN = 'search_vector'
+TEXT_SEARCH_INDEX = 'library_extension_request_search_vector_idx'
+
+
+def create_text_search_vector(cr):
+    """Add the generated full-text search column (rewrites the table once)"""
+    if column_exists(cr, 'library_extension_request', TEXT_SEARCH_COLUMN):
+        return
+    _logger.info("Adding %s to library_extension_request", TEXT_SEARCH_COLUMN)
+    cr.execute(f"""
+        ALTER TABLE library_extension_request
+        ADD COLUMN {TEXT_SEARCH_COLUMN} tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('{TEXT_SEARCH_CONFIG}', COALESCE(book_title, '')), 'A') ||
+            setweight(to_tsvector('{TEXT_SEARCH_CONFIG}', COALESCE(request_reason, '')), 'B') ||
+            setweight(to_tsvector('{TEXT_SEARCH_CONFIG}', COALESCE(rejection_reason, '')), 'B')
+        ) STORED
+    """)
+
+
+def create_text_search_index(cr, concurrently=False):
+    """Create the GIN index of the full-text search column"""
+    if index_exists(cr, TEXT_SEARCH_INDEX):
+        return
+    mode = 'CONCURRENTLY ' if concurrently else ''
+    cr.execute(f'CREATE INDEX {mode}{TEXT_SEARCH_INDEX} ON library_extension_request USING gin ({TEXT_SEARCH_COLUMN})')
+
+
+# Review priority. Urgency grows by a day for every day the request waits and every day
+# the due date comes closer, and drops by EXTENSION_PRIORITY_DAYS per extension already
+# approved for the member. Both day counts move together, so the stored key (lower is more urgent) only
+# changes with the request itself and never needs a daily recomputation.
+PRIORITY_EPOCH = date(1970, 1, 1)
+EXTENSION_PRIORITY_DAYS = 7
+PRIORITY_QUEUE_INDEX = 'library_extension_request_priority_queue_idx'
+
+
+def fill_priority_key(cr, member_ids=None):
+    """Set the priority key of every request, or of the requests of member_ids, in one statement"""
+    extension_count = 'COALESCE(member.approved_extension_requests, 0)' \
+        if column_exists(cr, 'library_member', 'approved_extension_requests') else '0'
+    cr.execute(f"""
+        UPDATE library_extension_request req
+           SET priority_key = (req.request_date::date - %(epoch)s)
+                              + (req.original_expiry_date - %(epoch)s)
+                              + %(extension_days)s * {extension_count}
+          FROM library_member member
+         WHERE member.id = req.member_id
+           AND req.original_expiry_date IS NOT NULL
+           AND (%(member_ids)s::int[] IS NULL OR member.id = ANY(%(member_ids)s::int[]))
+    """, {'epoch': PRIORITY_EPOCH, 'extension_days': EXTENSION_PRIORITY_DAYS, 'member_ids': member_ids})
 
 
 class LibraryExtensionRequest(models.Model):
@@ -28,6 +131,13 @@ class LibraryExtensionRequest(models.Model):
         store=True,
         readonly=True
     )
+    book_title = fields.Char(
+        related='book_id.title',
+        string='Book Title',
+        store=True,
+        readonly=True,
+        help='Stored sort key of the portal list'
+    )
     
     # Request details
     request_date = fields.Datetime(
@@ -76,6 +186,21 @@ class LibraryExtensionRequest(models.Model):
         readonly=True,
         help='New expiry date if approved'
     )
+    auto_approval_rule_id = fields.Many2one(
+        'library.extension.auto.rule',
+        string='Auto-Approved By',
+        readonly=True,
+        index='btree_not_null',
+        ondelete='set null',
+        help='Auto-approval rule that approved this request'
+    )
+    auto_review_date = fields.Datetime(
+        string='Auto-Review Date',
+        readonly=True,
+        copy=False,
+        help='When the auto-approval rules evaluated this request; '
+             'pending requests evaluated without a match wait for a librarian'
+    )
     
     # Computed fields
     extension_days = fields.Integer(
@@ -83,43 +208,41 @@ class LibraryExtensionRequest(models.Model):
         compute='_compute_extension_days',
         help='Number of days extension requested'
     )
+    priority_key = fields.Integer(
+        string='Priority Key',
+        compute='_compute_priority_key',
+        store=True,
+        readonly=True,
+        help='Review queue sort key; lower is more urgent'
+    )
+    priority_score = fields.Integer(
+        string='Priority',
+        compute='_compute_priority_score',
+        help='Days waited minus days left until the due date, less a week per extension already approved for the member; higher is more urgent'
+    )
+    member_overdue_count = fields.Integer(
+        related='member_id.overdue_books_count',
+        string='Member Overdue Books'
+    )
+    member_extension_count = fields.Integer(
+        related='member_id.approved_extension_requests',
+        string='Member Extensions'
+    )
+    text_search = fields.Char(
+        string='Text',
+        compute='_compute_text_search',
+        search='_search_text_search',
+        help='Full-text search over the book title and the request and rejection reasons'
+    )
     
     def _get_or_create_reviewer_librarian(self):
         """Get or create a librarian record for the current user"""
         reviewer_id = self.env.context.get('default_librarian_id')
         if reviewer_id:
             return reviewer_id
-            
-        # Try to find existing librarian record with matching email
-        librarian = None
-        if self.env.user.email:
-            librarian = self.env['library.librarian'].search([('email', '=', self.env.user.email)], limit=1)
-        
-        if librarian:
-            return librarian.id
-            
-        # Create new librarian record if user has permission
-        if self.env.user.has_group('base.group_system') or self.env.user.has_group('base.group_user'):
-            # Generate unique employee ID
-            existing_count = self.env['library.librarian'].search_count([])
-            employee_id = f"LIB{str(existing_count + 1).zfill(3)}"
-            
-            # Ensure employee ID is unique
-            while self.env['library.librarian'].search([('employee_id', '=', employee_id)]):
-                existing_count += 1
-                employee_id = f"LIB{str(existing_count + 1).zfill(3)}"
-            
-            librarian = self.env['library.librarian'].create({
-                'name': self.env.user.name or 'System User',
-                'employee_id': employee_id,
-                'email': self.env.user.email or '',
-                'phone': getattr(self.env.user, 'phone', '') or '',
-                'department': 'administration',
-                'position': 'head_librarian' if self.env.user.has_group('base.group_system') else 'librarian',
-            })
-            return librarian.id
-            
-        return None
+        
+        # Persisted user -> librarian link, cached per user after the first review
+        return self.env.user._get_reviewer_librarian().id or None
     
     @api.depends('original_expiry_date', 'requested_expiry_date')
     def _compute_extension_days(self):
@@ -131,118 +254,417 @@ class LibraryExtensionRequest(models.Model):
             else:
                 record.extension_days = 0
     
+    @api.depends('request_date', 'original_expiry_date', 'member_id.approved_extension_requests')
+    def _compute_priority_key(self):
+        """Time-independent review order, see EXTENSION_PRIORITY_DAYS"""
+        for record in self:
+            if record.request_date and record.original_expiry_date:
+                record.priority_key = (
+                    (record.request_date.date() - PRIORITY_EPOCH).days
+                    + (record.original_expiry_date - PRIORITY_EPOCH).days
+                    + EXTENSION_PRIORITY_DAYS * record.member_id.approved_extension_requests
+                )
+            else:
+                record.priority_key = False
+    
+    @api.depends('priority_key')
+    def _compute_priority_score(self):
+        """Priority of the stored key as of today"""
+        today = (fields.Date.context_today(self) - PRIORITY_EPOCH).days
+        for record in self:
+            record.priority_score = 2 * today - record.priority_key if record.priority_key else 0
+    
     @api.model
-    def create(self, vals):
-        """Generate sequence number for extension request"""
-        if vals.get('name', 'New') == 'New':
-            vals['name'] = self.env['ir.sequence'].sudo().next_by_code('library.extension.request') or 'New'
-        
-        # Set original expiry date from borrowing record
-        if vals.get('borrowing_record_id') and not vals.get('original_expiry_date'):
-            borrowing_record = self.env['library.borrowing.record'].browse(vals['borrowing_record_id'])
+    def _allocate_names(self, count):
+        """Reserve count request references from the sequence in one round trip"""
+        sequence = self.env['ir.sequence'].sudo().search([
+            ('code', '=', 'library.extension.request'),
+            ('company_id', 'in', [self.env.company.id, False])
+        ], order='company_id', limit=1)
+        if not sequence:
+            return ['New'] * count
+        if sequence.implementation != 'standard' or sequence.use_date_range:
+            # Gapless and date-ranged sequences have to be drawn one number at a time
+            return [sequence.next_by_id() for _i in range(count)]
+        self.env.cr.execute(
+            "SELECT nextval(%s) FROM generate_series(1, %s)",
+            [f'ir_sequence_{sequence.id:03d}', count]
+        )
+        return [sequence.get_next_char(number) for (number,) in self.env.cr.fetchall()]
+    
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Generate sequence numbers and copy expiry dates for a batch of requests"""
+        # Sequence numbers for the whole batch in one block
+        missing_names = [vals for vals in vals_list if vals.get('name', 'New') == 'New']
+        for vals, name in zip(missing_names, self._allocate_names(len(missing_names)) if missing_names else []):
+            vals['name'] = name
+        
+        # Set original expiry date from borrowing records, read in one query
+        borrowing_ids = {vals['borrowing_record_id'] for vals in vals_list
+                         if vals.get('borrowing_record_id') and not vals.get('original_expiry_date')}
+        if borrowing_ids:
+            borrowing_records = self.env['library.borrowing.record'].browse(borrowing_ids)
             # Use expected_return_date since current_expiry_date may not be available yet
-            vals['original_expiry_date'] = borrowing_record.expected_return_date
+            expiry_dates = dict(zip(borrowing_records.ids, borrowing_records.mapped('expected_return_date')))
+            for vals in vals_list:
+                if vals.get('borrowing_record_id') in expiry_dates and not vals.get('original_expiry_date'):
+                    vals['original_expiry_date'] = expiry_dates[vals['borrowing_record_id']]
         
-        return super().create(vals)
+        # Rows are inserted right away, so the pending request index is checked here
+        try:
+            with self.env.cr.savepoint():
+                records = super().create(vals_list)
+        except psycopg2.errors.UniqueViolation as e:
+            self._raise_pending_request_conflict(e, [vals.get('borrowing_record_id') for vals in vals_list])
+        self.env['library.member']._invalidate_portal_counters(records.member_id.ids)
+        if any(record.status == 'pending' for record in records):
+            self.env['library.extension.auto.rule']._trigger_auto_approval()
+        return records
+    
+    def write(self, vals):
+        """Drop cached PDF reports and portal counters that show the changed requests"""
+        if vals.get('status') == 'pending' or 'borrowing_record_id' in vals:
+            # Flush in a savepoint so a duplicate pending request is reported here, not at commit
+            borrowing_record_ids = self.borrowing_record_id.ids
+            try:
+                with self.env.cr.savepoint():
+                    result = super().write(vals)
+                    self.flush_recordset(['borrowing_record_id', 'status'])
+            except psycopg2.errors.UniqueViolation as e:
+                self._raise_pending_request_conflict(e, borrowing_record_ids + [vals.get('borrowing_record_id')], self.ids)
+        else:
+            result = super().write(vals)
+        self._invalidate_report_cache()
+        self.env['library.member']._invalidate_portal_counters(self.member_id.ids)
+        return result
+    
+    def unlink(self):
+        """Drop cached PDF reports and portal counters of the borrowing records"""
+        borrowing_records = self.borrowing_record_id
+        member_ids = self.member_id.ids
+        result = super().unlink()
+        self.env['library.report.cache']._invalidate_report_cache(borrowing_records)
+        self.env['library.member']._invalidate_portal_counters(member_ids)
+        return result
+    
+    def _invalidate_report_cache(self):
+        """Drop cached PDF reports of these requests and their borrowing records"""
+        ReportCache = self.env['library.report.cache']
+        ReportCache._invalidate_report_cache(self)
+        ReportCache._invalidate_report_cache(self.borrowing_record_id)
     
     @api.constrains('requested_expiry_date', 'original_expiry_date')
     def _check_extension_date(self):
         """Validate extension date"""
+        policies = self.env['library.extension.policy']._get_member_policies(self.member_id)
         for record in self:
             if record.requested_expiry_date and record.original_expiry_date:
                 if record.requested_expiry_date <= record.original_expiry_date:
                     raise ValidationError('Requested expiry date must be after current expiry date.')
                 
                 # Check maximum extension days
-                max_extension_days = int(self.env['ir.config_parameter'].sudo().get_param(
-                    'book_borrower_portal.max_extension_days', 14))
-                if record.extension_days > max_extension_days:
-                    raise ValidationError(f'Extension cannot exceed {max_extension_days} days.')
-    
-    @api.constrains('borrowing_record_id', 'status')
-    def _check_pending_requests(self):
-        """Prevent multiple pending requests for same borrowing record"""
-        for record in self:
-            if record.status == 'pending':
-                # Check if there's already a pending request for this borrowing record
-                existing_pending = self.search([
-                    ('borrowing_record_id', '=', record.borrowing_record_id.id),
-                    ('status', '=', 'pending'),
-                    ('id', '!=', record.id)
-                ])
-                if existing_pending:
-                    raise ValidationError(
-                        f'There is already a pending extension request for this borrowing record. '
-                        f'Please wait for the current request ({existing_pending[0].name}) to be processed before submitting a new one.'
-                    )
+                policy = policies.get(record.member_id.id) or self.env['library.extension.policy']._get_policy()
+                if record.extension_days > policy.max_extension_days:
+                    raise ValidationError(f'Extension cannot exceed {policy.max_extension_days} days.')
+    
+    def _compute_text_search(self):
+        """Search-only field, it has no value"""
+        self.text_search = False
+    
+    def _search_text_search(self, operator, value):
+        """Match requests whose search vector satisfies the web-style query value"""
+        if operator not in ('=', 'ilike') or not isinstance(value, str):
+            raise UserError('Text search only supports searching for a text.')
+        return [('id', 'in', SQL(
+            "SELECT id FROM library_extension_request WHERE %s @@ websearch_to_tsquery(%s, %s)",
+            SQL.identifier(TEXT_SEARCH_COLUMN), TEXT_SEARCH_CONFIG, value,
+        ))]
+    
+    @api.model
+    def _get_text_search_query(self, domain):
+        """Text searched for in domain, if any"""
+        for leaf in domain or []:
+            if isinstance(leaf, (list, tuple)) and len(leaf) == 3 and leaf[0] == 'text_search' \
+                    and isinstance(leaf[2], str):
+                return leaf[2]
+        return None
+    
+    @api.model
+    def search_fetch(self, domain, field_names, offset=0, limit=None, order=None):
+        """Rank text search results by relevance unless another order was asked for.
+        
+        Done here rather than in _search, so counts and groupings on a text search
+        never get an ORDER BY they cannot use.
+        """
+        text = self._get_text_search_query(domain)
+        # An empty order and _order both mean "no explicit order"
+        if not text or (order and order != self._order):
+            return super().search_fetch(domain, field_names, offset=offset, limit=limit, order=order)
+        query = self._search(domain, offset=offset, limit=limit, order=order or self._order)
+        if query.is_empty():
+            return self.browse()
+        query.order = SQL(
+            "ts_rank(%s, websearch_to_tsquery(%s, %s)) DESC, %s",
+            SQL.identifier(self._table, TEXT_SEARCH_COLUMN), TEXT_SEARCH_CONFIG, text, query.order,
+        )
+        return self._fetch_query(query, self._determine_fields_to_fetch(field_names))
+    
+    def _auto_init(self):
+        """Create and fill the priority key in SQL instead of computing it request by request"""
+        cr = self.env.cr
+        if table_exists(cr, self._table) and not column_exists(cr, self._table, 'priority_key'):
+            create_column(cr, self._table, 'priority_key', 'int4')
+            fill_priority_key(cr)
+        return super()._auto_init()
+    
+    def init(self):
+        """Enforce one pending request per borrowing record and index the portal lists, text search and review queue"""
+        super().init()
+        create_portal_list_indexes(self.env.cr)
+        create_text_search_vector(self.env.cr)
+        create_text_search_index(self.env.cr)
+        if not index_exists(self.env.cr, PRIORITY_QUEUE_INDEX):
+            self.env.cr.execute(f"""
+                CREATE INDEX {PRIORITY_QUEUE_INDEX}
+                    ON library_extension_request (priority_key, id)
+                 WHERE status = 'pending'
+            """)
+        if index_exists(self.env.cr, PENDING_REQUEST_INDEX):
+            return
+        try:
+            with self.env.cr.savepoint(flush=False):
+                self.env.cr.execute(f"""
+                    CREATE UNIQUE INDEX {PENDING_REQUEST_INDEX}
+                        ON library_extension_request (borrowing_record_id)
+                     WHERE status = 'pending'
+                """)
+        except psycopg2.IntegrityError:
+            _logger.error(
+                "Cannot create %s: some borrowing records have several pending extension requests. "
+                "Approve or reject the duplicates and update the module again.", PENDING_REQUEST_INDEX)
+    
+    @api.model
+    def _raise_pending_request_conflict(self, error, borrowing_record_ids, exclude_ids=()):
+        """Translate a violation of the pending request index into a validation error"""
+        if error.diag.constraint_name != PENDING_REQUEST_INDEX:
+            raise error
+        # Only reached on conflict: look up the request holding the slot for the message
+        existing_pending = self.sudo().search([
+            ('borrowing_record_id', 'in', [rid for rid in borrowing_record_ids if rid]),
+            ('status', '=', 'pending'),
+            ('id', 'not in', list(exclude_ids))
+        ], limit=1)
+        # A request committed by a concurrent transaction is not visible in this snapshot
+        current_request = f' ({existing_pending.name})' if existing_pending else ''
+        raise ValidationError(
+            f'There is already a pending extension request for this borrowing record. '
+            f'Please wait for the current request{current_request} to be processed before submitting a new one.'
+        ) from None
     
     def action_approve(self):
-        """Approve extension request"""
-        self.ensure_one()
-        if self.status != 'pending':
+        """Approve extension request(s)"""
+        if len(self) == 1 and self.status != 'pending':
             raise UserError('Only pending requests can be approved.')
         
-        # Update the borrowing record expected return date
-        self.borrowing_record_id.write({
-            'expected_return_date': self.requested_expiry_date
-        })
+        approved, failures = self._approve_requests()
+        
+        if len(self) == 1:
+            if failures:
+                raise UserError(failures[self])
+            return {
+                'type': 'ir.actions.client',
+                'tag': 'display_notification',
+                'params': {
+                    'title': 'Extension Approved',
+                    'message': f'Extension request {self.name} has been approved.',
+                    'type': 'success',
+                }
+            }
+        
+        return self._get_bulk_review_notification('Extensions Approved', 'approved', approved, failures)
+    
+    def action_reject(self):
+        """Reject extension request(s)"""
+        if len(self) == 1 and self.status != 'pending':
+            raise UserError('Only pending requests can be rejected.')
+        
+        pending_requests = self.filtered(lambda r: r.status == 'pending')
+        if not pending_requests:
+            raise UserError('Only pending requests can be rejected.')
+        
+        context = {'default_request_ids': [(6, 0, pending_requests.ids)]}
+        if len(pending_requests) == 1:
+            context['default_request_id'] = pending_requests.id
+        
+        return {
+            'type': 'ir.actions.act_window',
+            'name': 'Reject Extension Request' if len(pending_requests) == 1 else 'Reject Extension Requests',
+            'res_model': 'library.extension.request.reject.wizard',
+            'view_mode': 'form',
+            'target': 'new',
+            'context': context,
+        }
+    
+    def _split_pending_requests(self, action_label):
+        """Split requests into pending ones and a failure map for the others"""
+        failures = {}
+        pending_requests = self.browse()
+        for record in self:
+            if record.status == 'pending':
+                pending_requests |= record
+            else:
+                failures[record] = f'Only pending requests can be {action_label}.'
+        return pending_requests, failures
+    
+    def _run_in_savepoint(self, operation, failures):
+        """Run operation on the whole recordset, falling back to one record at a time.
+        
+        Every attempt runs in its own savepoint so a failing record is reported in
+        failures without rolling back the rest of the batch. Returns the records
+        for which the operation succeeded.
+        """
+        try:
+            with self.env.cr.savepoint():
+                operation(self)
+            return self
+        except Exception:
+            if len(self) == 1:
+                raise
+        
+        succeeded = self.browse()
+        for record in self:
+            try:
+                with self.env.cr.savepoint():
+                    operation(record)
+                succeeded |= record
+            except Exception as e:
+                _logger.info("Extension request %s could not be processed: %s", record.name, e)
+                failures[record] = str(e)
+        return succeeded
+    
+    def _approve_requests(self):
+        """Approve pending requests in bulk.
+        
+        Borrowing records are updated through the extension ledger, the reviewer
+        librarian is resolved once and notifications are queued as a single batch.
+        Returns a tuple (approved requests, {request: error message}).
+        """
+        pending_requests, failures = self._split_pending_requests('approved')
+        approved = self.browse()
+        if not pending_requests:
+            return approved, failures
         
-        # Get or create reviewer librarian record
         reviewer_id = self._get_or_create_reviewer_librarian()
+        review_date = fields.Datetime.now()
         
-        # Update extension request
-        self.write({
-            'status': 'approved',
-            'reviewed_by': reviewer_id,
-            'review_date': fields.Datetime.now(),
-            'new_expiry_date': self.requested_expiry_date
-        })
+        for expiry_date, requests in pending_requests.grouped('requested_expiry_date').items():
+            def approve(batch, expiry_date=expiry_date):
+                batch.write({
+                    'status': 'approved',
+                    'reviewed_by': reviewer_id,
+                    'review_date': review_date,
+                    'new_expiry_date': expiry_date
+                })
+                # The ledger moves the due date and counts the extension of the borrowing records
+                self.env['library.extension.ledger'].sudo()._record_approvals(batch)
+            try:
+                approved |= requests._run_in_savepoint(approve, failures)
+            except Exception as e:
+                failures[requests] = str(e)
         
-        # Send notification email
-        self._send_approval_notification()
+        # Send notification emails
+        if approved:
+            approved._send_approval_notification()
         
+        return approved, failures
+    
+    def _reject_requests(self, rejection_reason):
+        """Reject pending requests in bulk with a shared reason.
+        
+        Returns a tuple (rejected requests, {request: error message}).
+        """
+        pending_requests, failures = self._split_pending_requests('rejected')
+        rejected = self.browse()
+        if not pending_requests:
+            return rejected, failures
+        
+        reviewer_id = self._get_or_create_reviewer_librarian()
+        
+        def reject(batch):
+            batch.write({
+                'status': 'rejected',
+                'reviewed_by': reviewer_id,
+                'review_date': fields.Datetime.now(),
+                'rejection_reason': rejection_reason
+            })
+        try:
+            rejected = pending_requests._run_in_savepoint(reject, failures)
+        except Exception as e:
+            failures[pending_requests] = str(e)
+        
+        # Send notification emails
+        if rejected:
+            rejected._send_rejection_notification()
+        
+        return rejected, failures
+    
+    @api.model
+    def _get_bulk_review_notification(self, title, action_label, processed, failures):
+        """Build the client notification summarising a bulk review"""
+        message = f'{len(processed)} extension request(s) {action_label}.'
+        if failures:
+            # Only list the first few failures to keep the notification readable
+            details = '; '.join(
+                f"{', '.join(requests.mapped('name'))}: {error}"
+                for requests, error in list(failures.items())[:10]
+            )
+            message += f' {sum(len(requests) for requests in failures)} failed - {details}'
         return {
             'type': 'ir.actions.client',
             'tag': 'display_notification',
             'params': {
-                'title': 'Extension Approved',
-                'message': f'Extension request {self.name} has been approved.',
-                'type': 'success',
+                'title': title,
+                'message': message,
+                'type': 'warning' if failures else 'success',
+                'sticky': bool(failures),
+                'next': {'type': 'ir.actions.client', 'tag': 'soft_reload'},
             }
         }
     
-    def action_reject(self):
-        """Reject extension request"""
-        self.ensure_one()
-        if self.status != 'pending':
-            raise UserError('Only pending requests can be rejected.')
+    def _send_notification(self, template_xmlid):
+        """Send or queue the email of template_xmlid for each request.
         
-        return {
-            'type': 'ir.actions.act_window',
-            'name': 'Reject Extension Request',
-            'res_model': 'library.extension.request.reject.wizard',
-            'view_mode': 'form',
-            'target': 'new',
-            'context': {'default_request_id': self.id}
-        }
+        In 'queue' mode the emails go through the notification outbox and are sent
+        by its cron after commit; otherwise a single request is sent right away and
+        bulk reviews queue their emails for the mail cron.
+        """
+        if not self:
+            return
+        template = self.env.ref(template_xmlid, raise_if_not_found=False)
+        if not template:
+            return
+        
+        notification_mode = self.env['ir.config_parameter'].sudo().get_param(
+            'book_borrower_portal.notification_mode', 'sync')
+        if notification_mode == 'queue':
+            self.env['library.notification.outbox']._enqueue(template, self)
+        elif len(self) == 1:
+            template.sudo().send_mail(self.id, force_send=True)
+        else:
+            template.sudo().send_mail_batch(self.ids, force_send=False)
     
     def _send_request_notification(self):
-        """Send email notification when extension request is submitted"""
-        template = self.env.ref('book_borrower_portal.extension_request_submitted_email', raise_if_not_found=False)
-        if template:
-            template.sudo().send_mail(self.id, force_send=True)
+        """Send email notification when extension request(s) are submitted"""
+        self._send_notification('book_borrower_portal.extension_request_submitted_email')
     
     def _send_approval_notification(self):
-        """Send email notification when extension request is approved"""
-        template = self.env.ref('book_borrower_portal.extension_request_approved_email', raise_if_not_found=False)
-        if template:
-            template.sudo().send_mail(self.id, force_send=True)
+        """Send email notification when extension request(s) are approved"""
+        self._send_notification('book_borrower_portal.extension_request_approved_email')
     
     def _send_rejection_notification(self):
-        """Send email notification when extension request is rejected"""
-        template = self.env.ref('book_borrower_portal.extension_request_rejected_email', raise_if_not_found=False)
-        if template:
-            template.sudo().send_mail(self.id, force_send=True)
+        """Send email notification when extension request(s) are rejected"""
+        self._send_notification('book_borrower_portal.extension_request_rejected_email')
     
     def name_get(self):
         """Custom name display"""
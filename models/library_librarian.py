@@ -0,0 +1,56 @@
+from odoo import models, fields, api
+import logging
+
+_logger = logging.getLogger(__name__)
+
+EMPLOYEE_ID_PREFIX = 'LIB'
+
+
+class LibraryLibrarian(models.Model):
+    _inherit = 'library.librarian'
+    
+    user_ids = fields.One2many(
+        'res.users',
+        'library_librarian_id',
+        string='Users',
+        help='Users reviewing extension requests as this librarian'
+    )
+    
+    @api.model
+    def _next_employee_id(self):
+        """Allocate the next free LIB employee id from the sequence"""
+        Sequence = self.env['ir.sequence'].sudo()
+        employee_id = Sequence.next_by_code('library.librarian')
+        # Ids typed in by hand may already use a number; skip them (rarely more than once)
+        while self.sudo().search_count([('employee_id', '=', employee_id)], limit=1):
+            employee_id = Sequence.next_by_code('library.librarian')
+        return employee_id
+    
+    @api.model
+    def _create_for_user(self, user):
+        """Create the librarian record a user reviews as"""
+        return self.sudo().create({
+            'name': user.name or 'System User',
+            'employee_id': self._next_employee_id(),
+            'email': user.email or '',
+            'phone': getattr(user, 'phone', '') or '',
+            'department': 'administration',
+            'position': 'head_librarian' if user.has_group('base.group_system') else 'librarian',
+        })
+    
+    @api.model
+    def _sync_employee_sequence(self):
+        """Start the employee id sequence after the highest existing LIB number"""
+        sequence = self.env.ref('book_borrower_portal.librarian_employee_sequence', raise_if_not_found=False)
+        if not sequence:
+            return
+        self.flush_model(['employee_id'])
+        self.env.cr.execute("""
+            SELECT MAX(substring(employee_id FROM %s)::int)
+              FROM library_librarian
+             WHERE employee_id ~ %s
+        """, [f'^{EMPLOYEE_ID_PREFIX}(\\d+)$', f'^{EMPLOYEE_ID_PREFIX}\\d+$'])
+        highest = self.env.cr.fetchone()[0] or 0
+        if sequence.number_next_actual <= highest:
+            _logger.info("Librarian employee sequence moved to %s", highest + 1)
+            sequence.sudo().number_next_actual = highest + 1
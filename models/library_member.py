@@ -1,5 +1,21 @@
+from collections import defaultdict
+import time
+
 from odoo import models, fields, api
 from odoo.exceptions import UserError
+from odoo.tools.lru import LRU
+
+# Portal home counters, cached per worker and keyed by (database, member id).
+# Entries are dropped when the member's borrowings or extension requests change in
+# this worker and expire after PORTAL_COUNTERS_TTL seconds to pick up changes made elsewhere.
+PORTAL_COUNTERS_TTL = 60
+PORTAL_HOME_COUNTERS = (
+    'borrowed_books_count',
+    'overdue_books_count',
+    'pending_extension_count',
+    'library_fines_total',
+)
+_portal_counters_cache = LRU(4096)
 
 
 class LibraryMember(models.Model):
@@ -26,30 +42,143 @@ class LibraryMember(models.Model):
         string='Last Portal Login',
         readonly=True
     )
+    category_id = fields.Many2one(
+        'library.member.category',
+        string='Member Category',
+        help='Category whose extension policy overrides apply to this member'
+    )
     
-    # Extension request statistics
+    # Extension request statistics (stored so they can be sorted, filtered and grouped)
+    extension_request_ids = fields.One2many(
+        'library.extension.request',
+        'member_id',
+        string='Extension Requests'
+    )
     total_extension_requests = fields.Integer(
         string='Total Extension Requests',
-        compute='_compute_extension_statistics'
+        compute='_compute_extension_statistics',
+        store=True
     )
     pending_extension_requests = fields.Integer(
         string='Pending Extension Requests',
-        compute='_compute_extension_statistics'
+        compute='_compute_extension_statistics',
+        store=True
     )
     approved_extension_requests = fields.Integer(
         string='Approved Extension Requests',
-        compute='_compute_extension_statistics'
+        compute='_compute_extension_statistics',
+        store=True
     )
     
+    _EXTENSION_STATISTICS_FIELDS = (
+        'total_extension_requests',
+        'pending_extension_requests',
+        'approved_extension_requests',
+    )
+    
+    @api.depends('extension_request_ids.status')
     def _compute_extension_statistics(self):
-        """Compute extension request statistics"""
+        """Compute extension request statistics with one grouped query for all members"""
+        counts = defaultdict(lambda: defaultdict(int))
+        member_ids = [member_id for member_id in self._origin.ids if member_id]
+        if member_ids:
+            groups = self.env['library.extension.request'].sudo()._read_group(
+                [('member_id', 'in', member_ids)],
+                groupby=['member_id', 'status'],
+                aggregates=['__count'],
+            )
+            for member, status, count in groups:
+                counts[member.id][status] = count
+        
         for member in self:
-            extension_requests = self.env['library.extension.request'].search([
-                ('member_id', '=', member.id)
-            ])
-            member.total_extension_requests = len(extension_requests)
-            member.pending_extension_requests = len(extension_requests.filtered(lambda r: r.status == 'pending'))
-            member.approved_extension_requests = len(extension_requests.filtered(lambda r: r.status == 'approved'))
+            member_counts = counts[member._origin.id]
+            member.total_extension_requests = sum(member_counts.values())
+            member.pending_extension_requests = member_counts['pending']
+            member.approved_extension_requests = member_counts['approved']
+    
+    @api.model
+    def _recompute_extension_statistics(self, batch_size=1000):
+        """Recompute stored extension statistics for all members in batches.
+        
+        Used to repair the counters after bulk SQL imports that bypass the ORM.
+        Each batch costs a single grouped query on the extension requests.
+        """
+        fields_to_compute = [self._fields[name] for name in self._EXTENSION_STATISTICS_FIELDS]
+        member_ids = self.with_context(active_test=False).search([], order='id').ids
+        for start in range(0, len(member_ids), batch_size):
+            members = self.browse(member_ids[start:start + batch_size])
+            for field in fields_to_compute:
+                self.env.add_to_compute(field, members)
+            members.flush_recordset(list(self._EXTENSION_STATISTICS_FIELDS))
+            members.invalidate_recordset()
+        return len(member_ids)
+    
+    def _get_portal_counters(self):
+        """Return the portal home counters of this member, cached per worker"""
+        self.ensure_one()
+        key = (self.env.cr.dbname, self.id)
+        cached = _portal_counters_cache.get(key)
+        if cached and cached[0] > time.monotonic() - PORTAL_COUNTERS_TTL:
+            return cached[1]
+        
+        # One grouped query gives the borrowed and overdue counts and the fines
+        BorrowingRecord = self.env['library.borrowing.record'].sudo()
+        # Settled fines are left out when library_management_1 tracks their payment
+        tracks_payment = 'fine_paid' in BorrowingRecord._fields
+        borrowing_groups = BorrowingRecord._read_group(
+            [('member_id', '=', self.id)],
+            groupby=['status', 'fine_paid'] if tracks_payment else ['status'],
+            aggregates=['__count', 'fine_amount:sum'],
+        )
+        counts = defaultdict(int)
+        fines_total = 0.0
+        for *keys, count, fines in borrowing_groups:
+            status = keys[0]
+            counts[status] += count
+            # Fines still owed: unpaid ones, or those of books not returned yet
+            unpaid = not keys[1] if tracks_payment else status in ('borrowed', 'overdue')
+            if unpaid:
+                fines_total += fines or 0.0
+        counters = {
+            'borrowed_books_count': counts['borrowed'],
+            'overdue_books_count': counts['overdue'],
+            'pending_extension_count': self.pending_extension_requests,
+            'library_fines_total': fines_total,
+        }
+        _portal_counters_cache[key] = (time.monotonic(), counters)
+        return counters
+    
+    @api.model
+    def _invalidate_portal_counters(self, member_ids):
+        """Drop cached portal home counters of the given members"""
+        for member_id in member_ids:
+            try:
+                del _portal_counters_cache[(self.env.cr.dbname, member_id)]
+            except KeyError:
+                pass
+    
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Persist the user -> member link of members created for a user"""
+        members = super().create(vals_list)
+        members._link_portal_users()
+        return members
+    
+    def write(self, vals):
+        """Persist the user -> member link when the link inputs of members change"""
+        result = super().write(vals)
+        if {'user_id', 'email', 'is_portal_user'} & set(vals):
+            self._link_portal_users()
+        return result
+    
+    def _link_portal_users(self):
+        """Point the users of these members, or sharing the email of portal members, at them"""
+        Users = self.env['res.users'].sudo()
+        emails = [member.email for member in self if member.is_portal_user and member.email]
+        users = self.user_id.sudo()
+        if emails:
+            users |= Users.search([('library_member_id', '=', False), ('email', 'in', emails)])
+        users._link_library_members()
     
     def create_portal_user(self):
         """Create portal user for this member"""
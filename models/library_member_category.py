@@ -0,0 +1,51 @@
+from odoo import models, fields, api
+from odoo.exceptions import ValidationError
+
+
+class LibraryMemberCategory(models.Model):
+    _name = 'library.member.category'
+    _description = 'Library Member Category'
+    _order = 'name'
+    
+    name = fields.Char(string='Category', required=True, translate=True)
+    active = fields.Boolean(default=True)
+    member_ids = fields.One2many(
+        'library.member',
+        'category_id',
+        string='Members'
+    )
+    
+    # Extension policy overrides
+    override_extension_policy = fields.Boolean(
+        string='Override Extension Policy',
+        help='Use the extension rules below for members of this category instead of the global settings'
+    )
+    max_extensions = fields.Integer(
+        string='Maximum Extensions',
+        default=2
+    )
+    min_days_before_expiry = fields.Integer(
+        string='Request Window (Days)',
+        default=3,
+        help='Extensions can be requested at most this many days before the due date'
+    )
+    extension_days = fields.Integer(
+        string='Default Extension (Days)',
+        default=14
+    )
+    max_extension_days = fields.Integer(
+        string='Maximum Extension (Days)',
+        default=14
+    )
+    
+    _sql_constraints = [
+        ('name_uniq', 'unique(name)', 'Member category names must be unique.'),
+    ]
+    
+    @api.constrains('max_extensions', 'min_days_before_expiry', 'extension_days', 'max_extension_days')
+    def _check_policy_values(self):
+        """Validate extension policy values"""
+        for category in self:
+            if min(category.max_extensions, category.min_days_before_expiry,
+                   category.extension_days, category.max_extension_days) < 0:
+                raise ValidationError('Extension policy values cannot be negative.')
\ No newline at end of file
@@ -0,0 +1,191 @@
+from odoo import models, fields, api
+from datetime import timedelta
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+class LibraryNotificationOutbox(models.Model):
+    _name = 'library.notification.outbox'
+    _description = 'Library Notification Outbox'
+    _order = 'next_attempt_date, id'
+    
+    # Retry policy: wait BACKOFF_MINUTES * 2^(attempt - 1) between attempts
+    MAX_ATTEMPTS = 5
+    BACKOFF_MINUTES = 5
+    
+    template_id = fields.Many2one(
+        'mail.template',
+        string='Email Template',
+        required=True,
+        ondelete='cascade'
+    )
+    model = fields.Char(
+        string='Related Model',
+        required=True
+    )
+    res_id = fields.Many2oneReference(
+        string='Related Record',
+        model_field='model',
+        required=True
+    )
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed')
+    ], string='Status', default='pending', required=True, index=True)
+    attempt_count = fields.Integer(
+        string='Attempts',
+        default=0,
+        readonly=True
+    )
+    next_attempt_date = fields.Datetime(
+        string='Next Attempt',
+        default=fields.Datetime.now,
+        required=True,
+        index=True
+    )
+    sent_date = fields.Datetime(
+        string='Sent On',
+        readonly=True
+    )
+    last_error = fields.Text(
+        string='Last Error',
+        readonly=True
+    )
+    
+    @api.model
+    def _enqueue(self, template, records):
+        """Queue one notification per record.
+        
+        Rows are inserted in the caller's transaction, so they only become visible to
+        the cron worker once that transaction commits and vanish if it rolls back.
+        """
+        if not records:
+            return self.browse()
+        entries = self.sudo().create([{
+            'template_id': template.id,
+            'model': records._name,
+            'res_id': record.id,
+        } for record in records])
+        cron = self.env.ref('book_borrower_portal.ir_cron_process_notification_outbox', raise_if_not_found=False)
+        if cron:
+            cron.sudo()._trigger()
+        return entries
+    
+    def _lock_pending_entries(self, batch_size):
+        """Lock a batch of due entries, skipping rows claimed by other cron workers"""
+        self.flush_model()
+        self.env.cr.execute("""
+            SELECT id
+              FROM library_notification_outbox
+             WHERE state = 'pending'
+               AND next_attempt_date <= %s
+          ORDER BY next_attempt_date, id
+             LIMIT %s
+               FOR UPDATE SKIP LOCKED
+        """, [fields.Datetime.now(), batch_size])
+        return self.browse([row[0] for row in self.env.cr.fetchall()])
+    
+    @api.model
+    def _cron_process_outbox(self, batch_size=200, smtp_session=None):
+        """Render and send queued notifications in batches.
+        
+        Emails of a batch are rendered per template in one pass and sent over a
+        shared SMTP connection. An explicit smtp_session can be passed to send through
+        a given connection (e.g. a local SMTP stand-in).
+        """
+        entries = self._lock_pending_entries(batch_size)
+        if not entries:
+            return 0
+        
+        sent = self.browse()
+        for template, template_entries in entries.grouped('template_id').items():
+            sent |= template_entries._send_batch(template, smtp_session=smtp_session)
+        
+        remaining = self.search_count([
+            ('state', '=', 'pending'),
+            ('next_attempt_date', '<=', fields.Datetime.now()),
+        ])
+        self.env['ir.cron']._notify_progress(done=len(entries), remaining=remaining)
+        _logger.info("Notification outbox: %s sent, %s failed, %s remaining",
+                     len(sent), len(entries) - len(sent), remaining)
+        return len(sent)
+    
+    def _send_batch(self, template, smtp_session=None):
+        """Send the notifications of entries sharing the same template"""
+        template = template.sudo()
+        existing_ids = set(self.env[template.model].browse(self.mapped('res_id')).exists().ids)
+        orphans = self.filtered(lambda e: e.res_id not in existing_ids)
+        if orphans:
+            orphans._mark_failed('Related record no longer exists.', final=True)
+        entries = self - orphans
+        if not entries:
+            return self.browse()
+        
+        try:
+            with self.env.cr.savepoint():
+                # Duplicate entries for the same record are coalesced into one email
+                res_ids = list(dict.fromkeys(entries.mapped('res_id')))
+                mails = template.send_mail_batch(res_ids, force_send=False)
+        except Exception as e:
+            _logger.warning("Notification outbox: rendering %s failed: %s", template.name, e)
+            entries._mark_failed(str(e))
+            return self.browse()
+        
+        if smtp_session:
+            mails._send(smtp_session=smtp_session, raise_exception=False)
+        else:
+            # mail.mail.send opens one SMTP connection per mail server for the batch
+            mails.send(raise_exception=False)
+        
+        # Sent mails are auto-deleted; the remaining ones failed and are retried by the outbox
+        failed_mails = mails.exists().filtered(lambda m: m.state == 'exception')
+        failed_res_ids = {mail.res_id: mail.failure_reason for mail in failed_mails}
+        failed_mails.unlink()
+        
+        sent = entries.filtered(lambda e: e.res_id not in failed_res_ids)
+        sent._mark_sent()
+        for entry in entries - sent:
+            entry._mark_failed(failed_res_ids.get(entry.res_id) or 'Unknown SMTP error')
+        return sent
+    
+    def _mark_sent(self):
+        """Flag entries as delivered"""
+        now = fields.Datetime.now()
+        for attempt_count, entries in self.grouped('attempt_count').items():
+            entries.write({
+                'state': 'sent',
+                'sent_date': now,
+                'attempt_count': attempt_count + 1,
+                'last_error': False,
+            })
+    
+    def _mark_failed(self, error, final=False):
+        """Schedule a retry with exponential backoff, or give up after MAX_ATTEMPTS"""
+        now = fields.Datetime.now()
+        for attempt_count, entries in self.grouped('attempt_count').items():
+            attempts = attempt_count + 1
+            if final or attempts >= self.MAX_ATTEMPTS:
+                entries.write({
+                    'state': 'failed',
+                    'attempt_count': attempts,
+                    'last_error': error,
+                })
+            else:
+                entries.write({
+                    'attempt_count': attempts,
+                    'next_attempt_date': now + timedelta(minutes=self.BACKOFF_MINUTES * 2 ** (attempts - 1)),
+                    'last_error': error,
+                })
+    
+    def action_retry(self):
+        """Put failed notifications back in the queue"""
+        self.filtered(lambda e: e.state == 'failed').write({
+            'state': 'pending',
+            'attempt_count': 0,
+            'next_attempt_date': fields.Datetime.now(),
+        })
+        cron = self.env.ref('book_borrower_portal.ir_cron_process_notification_outbox', raise_if_not_found=False)
+        if cron:
+            cron._trigger()
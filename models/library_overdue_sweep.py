@@ -0,0 +1,242 @@
+from odoo import models, fields, api
+from odoo.tools.sql import column_exists, index_exists
+import logging
+import psycopg2
+import time
+
+_logger = logging.getLogger(__name__)
+
+# Partial index of the borrowings the sweep has to look at
+OPEN_BORROWINGS_INDEX = 'library_borrowing_record_open_due_idx'
+
+# Member counters maintained by library_management_1 from the borrowing status and fines
+MEMBER_OVERDUE_FIELDS = ('current_borrowed', 'overdue_books_count', 'total_fines')
+
+
+class LibraryOverdueSweep(models.Model):
+    _name = 'library.overdue.sweep'
+    _description = 'Library Overdue Sweep'
+    _order = 'sweep_date desc, shard_index'
+    
+    # Rows per committed chunk, and seconds a cron run may spend before yielding
+    CHUNK_SIZE = 2000
+    TIME_BUDGET = 240
+    
+    sweep_date = fields.Date(string='Sweep Date', required=True, index=True)
+    shard_index = fields.Integer(string='Shard', required=True, default=0)
+    shard_count = fields.Integer(string='Shards', required=True, default=1)
+    range_start = fields.Integer(string='First Id', readonly=True,
+                                 help='Borrowing record ids handled by this shard start here (inclusive)')
+    range_end = fields.Integer(string='Last Id', readonly=True,
+                               help='Borrowing record ids handled by this shard end here (inclusive)')
+    last_id = fields.Integer(string='Checkpoint', readonly=True,
+                             help='Last borrowing record id committed; a restarted run resumes after it')
+    state = fields.Selection([
+        ('running', 'Running'),
+        ('done', 'Done')
+    ], string='Status', default='running', required=True)
+    run_count = fields.Integer(string='Runs', readonly=True)
+    rows_processed = fields.Integer(string='Rows Processed', readonly=True)
+    rows_updated = fields.Integer(string='Rows Updated', readonly=True)
+    duration = fields.Float(string='Time Taken (s)', readonly=True, digits=(16, 2))
+    
+    _sql_constraints = [
+        ('sweep_shard_unique', 'unique(sweep_date, shard_index, shard_count)',
+         'A shard can only be swept once per day.'),
+    ]
+    
+    def init(self):
+        """Index the open borrowings so each chunk is a short index range scan"""
+        super().init()
+        if not index_exists(self.env.cr, OPEN_BORROWINGS_INDEX):
+            self.env.cr.execute(f"""
+                CREATE INDEX {OPEN_BORROWINGS_INDEX}
+                    ON library_borrowing_record (id)
+                 WHERE status IN ('borrowed', 'overdue') AND actual_return_date IS NULL
+            """)
+    
+    @api.model
+    def _get_shard_ranges(self, shard_count):
+        """Split the borrowing record ids into shard_count contiguous ranges.
+        
+        All ranges come from one MIN/MAX snapshot, so they never overlap nor leave
+        gaps, whatever is inserted between the runs of the shards.
+        """
+        self.env.cr.execute("SELECT MIN(id), MAX(id) FROM library_borrowing_record")
+        min_id, max_id = self.env.cr.fetchone()
+        if min_id is None:
+            return [(0, -1)] * shard_count
+        span = (max_id - min_id) // shard_count + 1
+        ranges = []
+        for shard_index in range(shard_count):
+            range_start = min_id + shard_index * span
+            range_end = max_id if shard_index == shard_count - 1 else range_start + span - 1
+            ranges.append((range_start, range_end))
+        return ranges
+    
+    @api.model
+    def _get_sweep(self, sweep_date, shard_index, shard_count):
+        """Today's sweep of a shard, planned with its sibling shards on first run"""
+        domain = [
+            ('sweep_date', '=', sweep_date),
+            ('shard_index', '=', shard_index),
+            ('shard_count', '=', shard_count),
+        ]
+        sweep = self.search(domain, limit=1)
+        if sweep:
+            return sweep
+        
+        # The first shard to run plans the whole day in one transaction. A sibling
+        # planning concurrently hits the unique constraint and uses that plan.
+        try:
+            with self.env.cr.savepoint():
+                self.create([{
+                    'sweep_date': sweep_date,
+                    'shard_index': index,
+                    'shard_count': shard_count,
+                    'range_start': range_start,
+                    'range_end': range_end,
+                    'last_id': range_start - 1,
+                } for index, (range_start, range_end) in enumerate(self._get_shard_ranges(shard_count))])
+        except psycopg2.errors.UniqueViolation:
+            _logger.info("Overdue sweep %s: shards already planned by a concurrent run", sweep_date)
+        # Commit the plan so every run of the day resumes from the same ranges
+        self.env.cr.commit()
+        return self.search(domain, limit=1)
+    
+    def _get_update_assignments(self):
+        """SET clause refreshing status, overdue days and fines, limited to existing columns"""
+        cr = self.env.cr
+        assignments = ["status = 'overdue'"]
+        changed = ["status <> 'overdue'"]
+        if column_exists(cr, 'library_borrowing_record', 'days_overdue'):
+            assignments.append("days_overdue = %(sweep_date)s::date - expected_return_date")
+            changed.append("days_overdue IS DISTINCT FROM %(sweep_date)s::date - expected_return_date")
+            if column_exists(cr, 'library_borrowing_record', 'fine_amount') \
+                    and column_exists(cr, 'library_borrowing_record', 'fine_per_day'):
+                fine = "(%(sweep_date)s::date - expected_return_date) * COALESCE(fine_per_day, 0)"
+                assignments.append(f"fine_amount = {fine}")
+                changed.append(f"fine_amount IS DISTINCT FROM {fine}")
+        return ', '.join(assignments), ' OR '.join(changed)
+    
+    def _get_due_where(self):
+        """WHERE clause of the borrowings of the shard left to sweep after the checkpoint"""
+        return """
+               id > %(last_id)s
+               AND id <= %(range_end)s
+               AND status IN ('borrowed', 'overdue')
+               AND actual_return_date IS NULL
+               AND expected_return_date < %(sweep_date)s
+        """
+    
+    def _get_due_params(self):
+        """Parameters of _get_due_where for this sweep"""
+        self.ensure_one()
+        return {'last_id': self.last_id, 'range_end': self.range_end, 'sweep_date': self.sweep_date}
+    
+    def _sweep_chunk(self, assignments, changed):
+        """Refresh one chunk of overdue borrowings after the checkpoint.
+        
+        Returns (ids looked at, member ids of updated rows).
+        """
+        self.ensure_one()
+        cr = self.env.cr
+        params = dict(self._get_due_params(), limit=self.CHUNK_SIZE, uid=self.env.uid)
+        cr.execute(f"""
+            SELECT id
+              FROM library_borrowing_record
+             WHERE {self._get_due_where()}
+          ORDER BY id
+             LIMIT %(limit)s
+        """, params)
+        ids = [row[0] for row in cr.fetchall()]
+        if not ids:
+            return ids, []
+        
+        # Only rows whose status, days or fine actually change are written
+        cr.execute(f"""
+            UPDATE library_borrowing_record
+               SET {assignments},
+                   write_date = NOW() AT TIME ZONE 'UTC',
+                   write_uid = %(uid)s
+             WHERE id = ANY(%(ids)s)
+               AND ({changed})
+         RETURNING member_id
+        """, dict(params, ids=ids))
+        return ids, [row[0] for row in cr.fetchall()]
+    
+    def _refresh_members(self, member_ids):
+        """Recompute the stored member counters touched by the SQL update"""
+        Member = self.env['library.member'].sudo()
+        members = Member.browse(set(member_ids))
+        fnames = [fname for fname in MEMBER_OVERDUE_FIELDS
+                  if fname in Member._fields and Member._fields[fname].store and Member._fields[fname].compute]
+        for fname in fnames:
+            self.env.add_to_compute(Member._fields[fname], members)
+        if fnames:
+            members.flush_recordset(fnames)
+        members.invalidate_recordset()
+        Member._invalidate_portal_counters(members.ids)
+    
+    def _run(self):
+        """Sweep this shard chunk by chunk within the time budget, committing after each chunk"""
+        self.ensure_one()
+        started = time.monotonic()
+        assignments, changed = self._get_update_assignments()
+        BorrowingRecord = self.env['library.borrowing.record']
+        BorrowingRecord.flush_model()
+        
+        processed = updated = 0
+        while time.monotonic() - started < self.TIME_BUDGET:
+            ids, member_ids = self._sweep_chunk(assignments, changed)
+            if not ids:
+                self.state = 'done'
+                break
+            if member_ids:
+                BorrowingRecord.invalidate_model()
+                self._refresh_members(member_ids)
+            processed += len(ids)
+            updated += len(member_ids)
+            self.write({
+                'last_id': ids[-1],
+                'rows_processed': self.rows_processed + len(ids),
+                'rows_updated': self.rows_updated + len(member_ids),
+            })
+            # The checkpoint is committed with the chunk: a killed worker resumes after it
+            self.env.cr.commit()
+        
+        elapsed = time.monotonic() - started
+        self.write({
+            'run_count': self.run_count + 1,
+            'duration': self.duration + elapsed,
+        })
+        self.env.cr.commit()
+        _logger.info(
+            "Overdue sweep %s shard %s/%s: %s rows processed, %s updated in %.2fs (%s)",
+            self.sweep_date, self.shard_index + 1, self.shard_count, processed, updated, elapsed,
+            'done' if self.state == 'done' else f'checkpoint at id {self.last_id}',
+        )
+        return processed, updated
+    
+    @api.model
+    def _cron_sweep_overdue(self, shard_index=0, shard_count=1):
+        """Mark overdue borrowings and refresh their fines.
+        
+        Several crons can share the work by calling this with the same shard_count
+        and different shard_index values; each one sweeps its own id range.
+        """
+        sweep = self._get_sweep(fields.Date.context_today(self), shard_index, shard_count)
+        if sweep.state == 'done':
+            return
+        processed, _updated = sweep._run()
+        
+        remaining = 0
+        if sweep.state != 'done':
+            # Same rows as the chunks select: only borrowings already due count as work left
+            self.env.cr.execute(f"""
+                SELECT COUNT(*)
+                  FROM library_borrowing_record
+                 WHERE {sweep._get_due_where()}
+            """, sweep._get_due_params())
+            remaining = self.env.cr.fetchone()[0]
+        self.env['ir.cron']._notify_progress(done=processed, remaining=remaining)
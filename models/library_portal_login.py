@@ -0,0 +1,61 @@
+from odoo import models, fields, api
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+class LibraryPortalLogin(models.Model):
+    _name = 'library.portal.login'
+    _description = 'Buffered Portal Login'
+    _log_access = False
+    
+    member_id = fields.Many2one(
+        'library.member',
+        string='Member',
+        required=True,
+        ondelete='cascade'
+    )
+    login_date = fields.Datetime(
+        string='Login Date',
+        required=True
+    )
+    
+    @api.model
+    def _record_login(self, member_id):
+        """Buffer a login with a single append-only insert.
+        
+        Unlike updating library.member directly, concurrent logins never contend
+        for the member row; the cron folds the buffer into last_portal_login.
+        """
+        self.env.cr.execute("""
+            INSERT INTO library_portal_login (member_id, login_date)
+            VALUES (%s, NOW() AT TIME ZONE 'UTC')
+        """, [member_id])
+    
+    @api.model
+    def _cron_flush_logins(self):
+        """Move buffered logins to library.member in one batched update.
+        
+        GREATEST keeps the latest value when flushes of different workers or
+        delayed buffers arrive out of order.
+        """
+        self.env['library.member'].flush_model(['last_portal_login'])
+        self.env.cr.execute("""
+            WITH flushed AS (
+                DELETE FROM library_portal_login
+                  RETURNING member_id, login_date
+            ), latest AS (
+                SELECT member_id, MAX(login_date) AS login_date
+                  FROM flushed
+              GROUP BY member_id
+            )
+            UPDATE library_member m
+               SET last_portal_login = GREATEST(m.last_portal_login, latest.login_date)
+              FROM latest
+             WHERE m.id = latest.member_id
+        """)
+        updated = self.env.cr.rowcount
+        if updated:
+            self.env['library.member'].invalidate_model(['last_portal_login'])
+        _logger.debug("Portal login buffer: updated %s members", updated)
+        return updated
\ No newline at end of file
@@ -0,0 +1,135 @@
+from odoo import models, api, tools
+import hashlib
+import logging
+
+_logger = logging.getLogger(__name__)
+
+REPORT_CACHE_PREFIX = 'book_borrower_portal.report_cache'
+
+# Bumped per model when its cached report action vanished, so that only this
+# ormcache entry is missed instead of clearing the registry caches
+_report_action_generations = {}
+
+
+class LibraryReportCache(models.AbstractModel):
+    _name = 'library.report.cache'
+    _description = 'Library Report PDF Cache'
+    
+    REPORT_NAMES = {
+        'library.borrowing.record': 'book_borrower_portal.borrowing_record_report_template',
+        'library.extension.request': 'book_borrower_portal.extension_request_report_template',
+    }
+    REPORT_TITLES = {
+        'library.borrowing.record': 'Borrowing Record Report',
+        'library.extension.request': 'Extension Request Report',
+    }
+    
+    @api.model
+    @tools.ormcache('model_name', 'generation')
+    def _get_report_action_id(self, model_name, generation=0):
+        """Resolve the report action of a model once per worker"""
+        report_name = self.REPORT_NAMES[model_name]
+        Report = self.env['ir.actions.report'].sudo()
+        report_action = Report.search([('report_name', '=', report_name)], limit=1)
+        if not report_action:
+            # Create a simple report action on the fly if not found
+            report_action = Report.create({
+                'name': self.REPORT_TITLES[model_name],
+                'model': model_name,
+                'report_type': 'qweb-pdf',
+                'report_name': report_name,
+            })
+        return report_action.id
+    
+    @api.model
+    def _get_report_action(self, model_name):
+        """Return the report action of model_name, refreshing the cache if it vanished"""
+        generation = _report_action_generations.get(model_name, 0)
+        report_action = self.env['ir.actions.report'].sudo().browse(
+            self._get_report_action_id(model_name, generation))
+        if not report_action.exists():
+            generation = _report_action_generations[model_name] = generation + 1
+            report_action = report_action.browse(self._get_report_action_id(model_name, generation))
+        return report_action
+    
+    @api.model
+    def _get_report_validator(self, record):
+        """Return (version, last modified UTC datetime) of the rendered report of record.
+        
+        The version hashes everything the report depends on; the last modification
+        is the newest write date among them.
+        """
+        record.ensure_one()
+        record = record.sudo()
+        report_action = self._get_report_action(record._name)
+        write_dates = [
+            record.write_date, report_action.write_date,
+            record.member_id.write_date, record.book_id.write_date,
+        ]
+        parts = [record._name, record.id, self.env.lang]
+        if record._name == 'library.borrowing.record':
+            # The borrowing report lists all extension requests of the record
+            [(request_count, last_request_write)] = self.env['library.extension.request'].sudo()._read_group(
+                [('borrowing_record_id', '=', record.id)],
+                aggregates=['__count', 'write_date:max'],
+            )
+            parts.append(request_count)
+            write_dates.append(last_request_write)
+        else:
+            write_dates += [record.borrowing_record_id.write_date, record.reviewed_by.write_date]
+        version = hashlib.sha1(repr(parts + write_dates).encode()).hexdigest()
+        return version, max(filter(None, write_dates))
+    
+    @api.model
+    def _get_report_version(self, record):
+        """Return a hash of everything the rendered report of record depends on"""
+        return self._get_report_validator(record)[0]
+    
+    @api.model
+    def _get_attachment_name(self, record):
+        """Name of the cached PDF attachment of record"""
+        return f'{REPORT_CACHE_PREFIX}.{record._name}.{record.id}.pdf'
+    
+    @api.model
+    def _get_report_pdf(self, record, version=None):
+        """Return the PDF of record, rendering it only if its version changed"""
+        record.ensure_one()
+        version = version or self._get_report_version(record)
+        Attachment = self.env['ir.attachment'].sudo()
+        attachment_name = self._get_attachment_name(record)
+        
+        cached = Attachment.search([
+            ('res_model', '=', self._name),
+            ('name', '=', attachment_name),
+            ('description', '=', version),
+        ], limit=1)
+        if cached:
+            return cached.raw
+        
+        report_action = self._get_report_action(record._name)
+        pdf_content, _content_type = report_action._render_qweb_pdf(report_action.report_name, record.ids)
+        
+        # Replace older versions of the cached report
+        self._invalidate_report_cache(record)
+        Attachment.create({
+            'name': attachment_name,
+            'description': version,
+            'raw': pdf_content,
+            'mimetype': 'application/pdf',
+            # Owned by the cache, not by the record: kept out of its chatter and attachments
+            'res_model': self._name,
+        })
+        return pdf_content
+    
+    @api.model
+    def _invalidate_report_cache(self, records):
+        """Drop cached PDFs of records"""
+        if not records:
+            return
+        # Matched by name only, which also drops entries cached on the record itself
+        stale = self.env['ir.attachment'].sudo().search([
+            ('name', 'in', [self._get_attachment_name(record) for record in records]),
+        ])
+        if stale:
+            _logger.debug("Dropping %s cached report(s) of %s", len(stale), records)
+            stale.unlink()
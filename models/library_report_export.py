@@ -0,0 +1,242 @@
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+from odoo.tools.pdf import merge_pdf
+from markupsafe import Markup
+import logging
+import tempfile
+import zipfile
+
+_logger = logging.getLogger(__name__)
+
+
+class LibraryReportExport(models.Model):
+    _name = 'library.report.export'
+    _description = 'Library Report Export'
+    _inherit = ['mail.thread']
+    _order = 'create_date desc'
+    
+    # Exports above SYNC_LIMIT records are generated by the cron, CHUNK_SIZE records per render
+    SYNC_LIMIT = 50
+    CHUNK_SIZE = 100
+    
+    EXPORT_MODELS = {
+        'library.borrowing.record': {
+            'report_name': 'book_borrower_portal.borrowing_record_report_template',
+            'date_field': 'borrow_date',
+            'order': 'sequence desc',
+            'label': 'Borrowing_History',
+        },
+        'library.extension.request': {
+            'report_name': 'book_borrower_portal.extension_request_report_template',
+            'date_field': 'request_date',
+            'order': 'request_date desc',
+            'label': 'Extension_Requests',
+        },
+    }
+    
+    name = fields.Char(string='Export', required=True)
+    user_id = fields.Many2one(
+        'res.users',
+        string='Requested By',
+        required=True,
+        default=lambda self: self.env.user,
+        index=True
+    )
+    member_id = fields.Many2one(
+        'library.member',
+        string='Member',
+        required=True,
+        ondelete='cascade'
+    )
+    res_model = fields.Selection([
+        ('library.borrowing.record', 'Borrowing Records'),
+        ('library.extension.request', 'Extension Requests')
+    ], string='Documents', required=True)
+    export_format = fields.Selection([
+        ('pdf', 'Single PDF'),
+        ('zip', 'ZIP Archive')
+    ], string='Format', default='pdf', required=True)
+    date_from = fields.Date(string='From')
+    date_to = fields.Date(string='To')
+    state = fields.Selection([
+        ('pending', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed')
+    ], string='Status', default='pending', required=True, index=True)
+    record_count = fields.Integer(string='Documents Exported', readonly=True)
+    attachment_id = fields.Many2one('ir.attachment', string='File', readonly=True)
+    error_message = fields.Text(string='Error', readonly=True)
+    
+    def _get_export_domain(self):
+        """Domain of the documents included in this export"""
+        self.ensure_one()
+        config = self.EXPORT_MODELS[self.res_model]
+        domain = [('member_id', '=', self.member_id.id)]
+        if self.date_from:
+            domain += [(config['date_field'], '>=', self.date_from)]
+        if self.date_to:
+            domain += [(config['date_field'], '<=', self.date_to)]
+        return domain
+    
+    def _get_export_records(self):
+        """Documents of this export, in report order"""
+        self.ensure_one()
+        return self.env[self.res_model].sudo().search(
+            self._get_export_domain(), order=self.EXPORT_MODELS[self.res_model]['order'])
+    
+    def _get_filename(self):
+        """File name of the generated export"""
+        self.ensure_one()
+        label = self.EXPORT_MODELS[self.res_model]['label']
+        return f"{label}_{self.member_id.sequence or self.member_id.id}.{self.export_format}"
+    
+    def _iter_chunks(self, records):
+        """Yield records by CHUNK_SIZE with the data the report templates loop over prefetched"""
+        for start in range(0, len(records), self.CHUNK_SIZE):
+            chunk = records[start:start + self.CHUNK_SIZE]
+            # One query per relation for the whole chunk instead of one per document
+            chunk.mapped('book_id')
+            chunk.mapped('member_id')
+            if 'extension_request_ids' in chunk._fields:
+                chunk.mapped('extension_request_ids.reviewed_by')
+            else:
+                chunk.mapped('reviewed_by')
+            yield chunk
+            # Keep memory flat on exports of thousands of documents
+            chunk.invalidate_recordset()
+    
+    def _render_pdf(self, records):
+        """Render records in chunks and merge them into a single PDF"""
+        self.ensure_one()
+        Report = self.env['ir.actions.report'].sudo()
+        report_name = self.EXPORT_MODELS[self.res_model]['report_name']
+        chunk_pdfs = []
+        for chunk in self._iter_chunks(records):
+            pdf_content, _content_type = Report._render_qweb_pdf(report_name, chunk.ids)
+            chunk_pdfs.append(pdf_content)
+        return merge_pdf(chunk_pdfs) if len(chunk_pdfs) > 1 else chunk_pdfs[0]
+    
+    def _render_zip(self, records, fileobj):
+        """Render records in chunks and write one PDF per document into a ZIP archive"""
+        self.ensure_one()
+        Report = self.env['ir.actions.report'].sudo()
+        ReportCache = self.env['library.report.cache']
+        report_name = self.EXPORT_MODELS[self.res_model]['report_name']
+        with zipfile.ZipFile(fileobj, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            for chunk in self._iter_chunks(records):
+                # A chunk is rendered in one run and split per document
+                streams = Report._render_qweb_pdf_prepare_streams(report_name, {}, chunk.ids)
+                for record in chunk:
+                    stream = streams.get(record.id, {}).get('stream')
+                    if stream:
+                        pdf_content = stream.getvalue()
+                    else:
+                        pdf_content = ReportCache._get_report_pdf(record)
+                    archive.writestr(f"{record.display_name.replace('/', '_')}_{record.id}.pdf", pdf_content)
+                for stream_data in streams.values():
+                    if stream_data.get('stream'):
+                        stream_data['stream'].close()
+        return fileobj
+    
+    def _generate_file(self):
+        """Generate the export into a temporary file, returned open at its start.
+        
+        The caller closes the file, typically once it has been streamed.
+        """
+        self.ensure_one()
+        records = self._get_export_records()
+        if not records:
+            raise UserError('There are no documents to export for the selected period.')
+        
+        self.record_count = len(records)
+        fileobj = tempfile.TemporaryFile()
+        try:
+            if self.export_format == 'pdf':
+                fileobj.write(self._render_pdf(records))
+            else:
+                self._render_zip(records, fileobj)
+        except Exception:
+            fileobj.close()
+            raise
+        fileobj.seek(0)
+        return fileobj
+    
+    def _generate(self):
+        """Generate the export file and return its content"""
+        with self._generate_file() as fileobj:
+            return fileobj.read()
+    
+    def _find_pending(self):
+        """Export of the same documents already queued or running, if any"""
+        self.ensure_one()
+        return self.search([
+            ('member_id', '=', self.member_id.id),
+            ('res_model', '=', self.res_model),
+            ('export_format', '=', self.export_format),
+            ('date_from', '=', self.date_from),
+            ('date_to', '=', self.date_to),
+            ('state', 'in', ('pending', 'running')),
+        ], limit=1)
+    
+    def _get_mimetype(self):
+        """Mimetype of the generated export"""
+        return 'application/pdf' if self.export_format == 'pdf' else 'application/zip'
+    
+    def _get_download_url(self):
+        """Portal URL to download the generated export"""
+        self.ensure_one()
+        return f'/my/exports/{self.id}/download'
+    
+    def _run(self):
+        """Generate the export, store it as attachment and notify the requesting user"""
+        for export in self:
+            export.state = 'running'
+            try:
+                with self.env.cr.savepoint():
+                    content = export._generate()
+                    export.attachment_id = self.env['ir.attachment'].sudo().create({
+                        'name': export._get_filename(),
+                        'raw': content,
+                        'mimetype': export._get_mimetype(),
+                        'res_model': export._name,
+                        'res_id': export.id,
+                    })
+                    export.state = 'done'
+            except Exception as e:
+                _logger.warning("Report export %s failed: %s", export.name, e)
+                export.write({'state': 'failed', 'error_message': str(e)})
+                continue
+            
+            export.message_notify(
+                partner_ids=export.user_id.partner_id.ids,
+                subject=f'Your export is ready: {export.name}',
+                body=Markup(
+                    '<p>Your export of %s documents is ready.</p>'
+                    '<p><a href="%s">Download %s</a></p>'
+                ) % (export.record_count, export._get_download_url(), export._get_filename()),
+            )
+    
+    @api.model
+    def _cron_run_exports(self, limit=5):
+        """Generate queued exports in the background"""
+        self.flush_model()
+        self.env.cr.execute("""
+            SELECT id
+              FROM library_report_export
+             WHERE state = 'pending'
+          ORDER BY id
+             LIMIT %s
+               FOR UPDATE SKIP LOCKED
+        """, [limit])
+        exports = self.browse([row[0] for row in self.env.cr.fetchall()])
+        exports._run()
+        remaining = self.search_count([('state', '=', 'pending')])
+        self.env['ir.cron']._notify_progress(done=len(exports), remaining=remaining)
+    
+    def _schedule(self):
+        """Queue exports for the background worker"""
+        self.write({'state': 'pending'})
+        cron = self.env.ref('book_borrower_portal.ir_cron_run_report_exports', raise_if_not_found=False)
+        if cron:
+            cron.sudo()._trigger()
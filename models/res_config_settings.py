@@ -0,0 +1,48 @@
+from odoo import models, fields
+
+
+class ResConfigSettings(models.TransientModel):
+    _inherit = 'res.config.settings'
+    
+    library_notification_mode = fields.Selection([
+        ('sync', 'Send immediately'),
+        ('queue', 'Queue in outbox')
+    ], string='Notification Delivery',
+        default='sync',
+        config_parameter='book_borrower_portal.notification_mode',
+        help='Send extension request emails during the request, or queue them in the '
+             'notification outbox and deliver them in batches from a scheduled action')
+    library_reminder_days = fields.Char(
+        string='Reminder Days',
+        default='3,1,0',
+        config_parameter='book_borrower_portal.reminder_days',
+        help='Comma-separated days before the due date on which members get their daily '
+             'reminder digest (0 = on the due date)')
+    library_pager_count_limit = fields.Integer(
+        string='Portal List Count Limit',
+        default=1000,
+        config_parameter='book_borrower_portal.pager_count_limit',
+        help='Portal lists count matching records up to this limit and show "N+" beyond it. '
+             'Set to 0 to always count every record.')
+    
+    # Extension policy
+    library_max_extensions = fields.Integer(
+        string='Maximum Extensions',
+        default=2,
+        config_parameter='book_borrower_portal.max_extensions',
+        help='Maximum number of extensions granted per borrowing')
+    library_min_days_before_expiry = fields.Integer(
+        string='Request Window (Days)',
+        default=3,
+        config_parameter='book_borrower_portal.min_days_before_expiry',
+        help='Extensions can be requested at most this many days before the due date')
+    library_extension_days = fields.Integer(
+        string='Default Extension (Days)',
+        default=14,
+        config_parameter='book_borrower_portal.extension_days',
+        help='Extension proposed by default on the portal request form')
+    library_max_extension_days = fields.Integer(
+        string='Maximum Extension (Days)',
+        default=14,
+        config_parameter='book_borrower_portal.max_extension_days',
+        help='Longest extension a member can request')
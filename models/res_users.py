@@ -1,4 +1,7 @@
 from odoo import models, fields, api
+import logging
+
+_logger = logging.getLogger(__name__)
 
 
 class ResUsers(models.Model):
@@ -9,35 +12,144 @@ class ResUsers(models.Model):
         string='Library Member',
         help='Linked library member record'
     )
+    library_librarian_id = fields.Many2one(
+        'library.librarian',
+        string='Librarian',
+        index='btree_not_null',
+        copy=False,
+        help='Librarian record used when this user reviews extension requests'
+    )
     
     def _get_library_member(self):
-        """Get library member for current user"""
+        """Get library member for current user (read-only, never writes)"""
+        self.ensure_one()
+        # The link is persisted whenever users or members change, and backfilled on upgrade
+        return self.library_member_id
+    
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Link new users to their library member"""
+        users = super().create(vals_list)
+        users._link_library_members()
+        return users
+    
+    def write(self, vals):
+        """Link users to their library member when their email changes"""
+        result = super().write(vals)
+        if 'email' in vals:
+            self._link_library_members()
+        return result
+    
+    def _link_library_members(self):
+        """Persist the member of users not linked yet.
+        
+        A user is matched with the member pointing at it or, failing that, with
+        a portal member sharing its email, like _backfill_library_member_links.
+        """
+        users = self.sudo().filtered(lambda user: not user.library_member_id)
+        if not users:
+            return
+        Member = self.env['library.member'].sudo()
+        members_by_user = {member.user_id.id: member for member in Member.search(
+            [('user_id', 'in', users.ids)], order='id desc')}
+        emails = [email for email in users.mapped('email') if email]
+        members_by_email = {member.email: member for member in Member.search(
+            [('email', 'in', emails), ('is_portal_user', '=', True)], order='id desc')} if emails else {}
+        for user in users:
+            member = members_by_user.get(user.id) or members_by_email.get(user.email)
+            if member:
+                user.library_member_id = member
+    
+    def _get_reviewer_librarian(self):
+        """Librarian this user reviews extension requests as, linked on first use"""
+        self.ensure_one()
+        # The persisted link is read with the user, no cache to invalidate
+        librarian_id = self.sudo().library_librarian_id.id
+        if not librarian_id:
+            librarian_id = self._link_reviewer_librarian()
+        return self.env['library.librarian'].browse(librarian_id)
+    
+    def _link_reviewer_librarian(self):
+        """Find or create the librarian of this user and persist the link"""
         self.ensure_one()
-        if self.library_member_id:
-            return self.library_member_id
+        user = self.sudo()
+        # Lock the user row so concurrent first reviews create a single librarian
+        self.flush_model(['library_librarian_id'])
+        self.env.cr.execute("SELECT id FROM res_users WHERE id = %s FOR NO KEY UPDATE", [user.id])
+        user.invalidate_recordset(['library_librarian_id'])
+        librarian = user.library_librarian_id
+        if librarian:
+            return librarian.id
+        
+        Librarian = self.env['library.librarian'].sudo()
+        if user.email:
+            # Librarians created before the link existed are matched by email once
+            librarian = Librarian.search([('email', '=', user.email), ('user_ids', '=', False)], limit=1)
+        if not librarian:
+            if not user.has_group('base.group_user'):
+                return False
+            librarian = Librarian._create_for_user(user)
+        user.library_librarian_id = librarian
+        return librarian.id
+    
+    @api.model
+    def _backfill_library_member_links(self):
+        """Link existing users and library members in bulk.
+        
+        Users are matched with the member that already points at them or, failing
+        that, with a portal member sharing their email. Runs as two set-based
+        updates so portal page loads never have to persist the link.
+        """
+        self.env['library.member'].flush_model(['user_id', 'email', 'is_portal_user'])
+        self.flush_model(['library_member_id', 'partner_id'])
+        self.env['res.partner'].flush_model(['email'])
         
-        # Try to find by email
-        member = self.env['library.member'].search([
-            ('email', '=', self.email),
-            ('is_portal_user', '=', True)
-        ], limit=1)
+        self.env.cr.execute("""
+            WITH matches AS (
+                SELECT DISTINCT ON (u.id) u.id AS user_id, m.id AS member_id
+                  FROM res_users u
+                  JOIN res_partner p ON p.id = u.partner_id
+                  JOIN library_member m
+                    ON m.user_id = u.id
+                    OR (m.is_portal_user AND m.email IS NOT NULL AND m.email = p.email)
+                 WHERE u.library_member_id IS NULL
+              ORDER BY u.id, (m.user_id = u.id) DESC NULLS LAST, m.id
+            )
+            UPDATE res_users u
+               SET library_member_id = matches.member_id
+              FROM matches
+             WHERE u.id = matches.user_id
+         RETURNING u.id, matches.member_id
+        """)
+        links = self.env.cr.fetchall()
         
-        if member:
-            member.user_id = self.id
-            self.library_member_id = member.id
-            return member
+        linked_members = 0
+        if links:
+            self.env.cr.execute("""
+                UPDATE library_member m
+                   SET user_id = links.user_id
+                  FROM (SELECT unnest(%s::int[]) AS user_id, unnest(%s::int[]) AS member_id) AS links
+                 WHERE m.id = links.member_id
+                   AND m.user_id IS NULL
+            """, [[user_id for user_id, _member_id in links], [member_id for _user_id, member_id in links]])
+            linked_members = self.env.cr.rowcount
+            self.invalidate_model(['library_member_id'])
+            self.env['library.member'].invalidate_model(['user_id'])
         
-        return self.env['library.member']
+        _logger.info("Library member backfill: linked %s users and %s members", len(links), linked_members)
+        return len(links)
     
     @api.model
     def _update_last_login(self):
-        """Update last portal login for library members"""
+        """Buffer the last portal login of library members"""
         result = super()._update_last_login()
         
-        # Update last portal login for library members
-        if self.has_group('base.group_portal') and self.library_member_id:
-            self.library_member_id.sudo().write({
-                'last_portal_login': fields.Datetime.now()
-            })
+        # The login is appended to a buffer flushed by a cron, so logins never
+        # wait on the library.member row lock
+        user = self.env.user
+        if user.has_group('base.group_portal'):
+            member = user._get_library_member()
+            if member:
+                self.env['library.portal.login']._record_login(member.id)
         
         return result
\ No newline at end of file
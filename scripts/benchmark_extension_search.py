@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Benchmark extension request reason search: ilike scans vs. the full-text search vector.
+
+Builds a synthetic copy of the searched columns of library_extension_request in a
+temporary table (a million rows by default), adds the same generated tsvector column
+and GIN index as the module, then times both search paths with EXPLAIN ANALYZE.
+
+    python3 scripts/benchmark_extension_search.py --dsn "dbname=odoo" --rows 1000000
+"""
+import argparse
+import statistics
+import time
+
+import psycopg2
+
+TERMS = ['illness', 'exam', 'travel', 'hospital', 'research']
+
+REASONS = [
+    'Recovering from an illness and could not finish reading',
+    'Exam period, need the book for revision',
+    'Travelling abroad for a family event',
+    'Research project deadline moved',
+    'Still reading, the book is longer than expected',
+    'Hospital stay during the loan period',
+]
+TITLES = [
+    'Introduction to Algorithms', 'Clinical Medicine', 'Organic Chemistry',
+    'World History', 'Research Methods', 'Data Structures',
+]
+
+
+def setup(cr, rows):
+    """Create and fill the synthetic table, its search vector and GIN index"""
+    cr.execute("""
+        CREATE TEMP TABLE bench_extension_request (
+            id serial PRIMARY KEY,
+            book_title varchar,
+            request_reason text,
+            rejection_reason text
+        )
+    """)
+    cr.execute("""
+        INSERT INTO bench_extension_request (book_title, request_reason, rejection_reason)
+        SELECT (%(titles)s::varchar[])[1 + i %% %(title_count)s] || ' vol. ' || (i %% 97),
+               (%(reasons)s::text[])[1 + (i * 7) %% %(reason_count)s] || ' #' || i,
+               CASE WHEN i %% 5 = 0 THEN 'Book reserved by another member' END
+          FROM generate_series(1, %(rows)s) AS i
+    """, {
+        'titles': TITLES, 'title_count': len(TITLES),
+        'reasons': REASONS, 'reason_count': len(REASONS),
+        'rows': rows,
+    })
+    cr.execute("""
+        ALTER TABLE bench_extension_request
+        ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', COALESCE(book_title, '')), 'A') ||
+            setweight(to_tsvector('english', COALESCE(request_reason, '')), 'B') ||
+            setweight(to_tsvector('english', COALESCE(rejection_reason, '')), 'B')
+        ) STORED
+    """)
+    cr.execute("CREATE INDEX ON bench_extension_request USING gin (search_vector)")
+    cr.execute("ANALYZE bench_extension_request")
+
+
+def explain_time(cr, query, params):
+    """Execution time in ms reported by EXPLAIN ANALYZE"""
+    cr.execute("EXPLAIN (ANALYZE, FORMAT JSON) " + query, params)
+    return cr.fetchone()[0][0]['Execution Time']
+
+
+def run(cr, repeat):
+    ilike_query = """
+        SELECT id FROM bench_extension_request
+         WHERE request_reason ILIKE %(pattern)s
+            OR rejection_reason ILIKE %(pattern)s
+            OR book_title ILIKE %(pattern)s
+         ORDER BY id DESC
+         LIMIT 80
+    """
+    fts_query = """
+        SELECT id FROM bench_extension_request
+         WHERE search_vector @@ websearch_to_tsquery('english', %(term)s)
+         ORDER BY ts_rank(search_vector, websearch_to_tsquery('english', %(term)s)) DESC, id DESC
+         LIMIT 80
+    """
+    print(f"{'term':<12}{'ilike ms':>12}{'fts ms':>12}{'speedup':>10}")
+    for term in TERMS:
+        params = {'pattern': f'%{term}%', 'term': term}
+        ilike = statistics.median(explain_time(cr, ilike_query, params) for _i in range(repeat))
+        fts = statistics.median(explain_time(cr, fts_query, params) for _i in range(repeat))
+        print(f"{term:<12}{ilike:>12.1f}{fts:>12.1f}{ilike / fts:>9.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--dsn', default='dbname=postgres', help='libpq connection string')
+    parser.add_argument('--rows', type=int, default=1_000_000, help='synthetic rows to generate')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per query (median is reported)')
+    args = parser.parse_args()
+
+    with psycopg2.connect(args.dsn) as cnx, cnx.cursor() as cr:
+        start = time.monotonic()
+        setup(cr, args.rows)
+        print(f"Built {args.rows} rows, search vector and GIN index in {time.monotonic() - start:.1f}s")
+        run(cr, args.repeat)
+        cnx.rollback()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+/** @odoo-module **/
+
+import publicWidget from "@web/legacy/js/public/public_widget";
+import { rpc } from "@web/core/network/rpc";
+import { debounce } from "@web/core/utils/timing";
+import { _t } from "@web/core/l10n/translation";
+
+publicWidget.registry.BorrowedBooksSearch = publicWidget.Widget.extend({
+    selector: '.o_borrowed_books_search',
+    events: {
+        'input input[name="search"]': '_onInput',
+        'click .o_borrowed_books_search_more': '_onMore',
+    },
+
+    start: function() {
+        this.input = this.el.querySelector('input[name="search"]');
+        this.menu = this.el.querySelector('.o_borrowed_books_search_results');
+        this.page = 1;
+        // One request once the member stops typing, not one per keystroke
+        this._search = debounce(this._search.bind(this), 300);
+        return this._super.apply(this, arguments);
+    },
+
+    _getFilter: function() {
+        const filter = this.el.closest('form').querySelector('select[name="filterby"]');
+        return filter ? filter.value : 'all';
+    },
+
+    _onInput: function() {
+        this.page = 1;
+        this._search();
+    },
+
+    _onMore: function(ev) {
+        ev.preventDefault();
+        this.page += 1;
+        this._search();
+    },
+
+    _search: async function() {
+        const query = this.input.value.trim();
+        if (query.length < 2) {
+            this._close();
+            return;
+        }
+        const page = this.page;
+        const data = await rpc('/my/borrowed-books/search', {
+            query: query,
+            filterby: this._getFilter(),
+            page: page,
+        });
+        // Drop answers to queries the member has typed past
+        if (query !== this.input.value.trim() || page !== this.page) {
+            return;
+        }
+        this._render(data, page > 1);
+    },
+
+    _render: function(data, append) {
+        if (!append) {
+            this.menu.textContent = '';
+        }
+        const more = this.menu.querySelector('.o_borrowed_books_search_more');
+        if (more) {
+            more.remove();
+        }
+        if (!data.results.length && !append) {
+            const empty = document.createElement('span');
+            empty.className = 'dropdown-item-text text-muted';
+            empty.textContent = _t('No matching books');
+            this.menu.appendChild(empty);
+        }
+        for (const result of data.results) {
+            const item = document.createElement('a');
+            item.className = 'dropdown-item';
+            item.href = result.url;
+            const title = document.createElement('strong');
+            title.textContent = result.book_title;
+            const details = document.createElement('small');
+            details.className = 'd-block text-muted';
+            details.textContent = [result.sequence, result.author, result.isbn, result.status]
+                .filter(Boolean).join(' · ');
+            item.append(title, details);
+            this.menu.appendChild(item);
+        }
+        if (data.has_more) {
+            const moreLink = document.createElement('a');
+            moreLink.href = '#';
+            moreLink.className = 'dropdown-item text-primary o_borrowed_books_search_more';
+            moreLink.textContent = _t('More results');
+            this.menu.appendChild(moreLink);
+        }
+        this.menu.classList.add('show');
+    },
+
+    _close: function() {
+        this.menu.classList.remove('show');
+        this.menu.textContent = '';
+    },
+});
+
+export default publicWidget.registry.BorrowedBooksSearch;
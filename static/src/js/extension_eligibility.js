@@ -0,0 +1,59 @@
+/** @odoo-module **/
+
+import publicWidget from "@web/legacy/js/public/public_widget";
+import { rpc } from "@web/core/network/rpc";
+import { _t } from "@web/core/l10n/translation";
+
+publicWidget.registry.ExtensionEligibility = publicWidget.Widget.extend({
+    selector: '.o_library_extension_eligibility',
+
+    start: function() {
+        const def = this._super.apply(this, arguments);
+        this._loadEligibility();
+        return def;
+    },
+
+    _loadEligibility: async function() {
+        // One request for every row of the page
+        const cells = this.el.querySelectorAll('.o_extension_cell[data-borrowing-id]');
+        const borrowingIds = Array.from(cells, (cell) => parseInt(cell.dataset.borrowingId));
+        if (!borrowingIds.length) {
+            return;
+        }
+
+        const eligibility = await rpc('/my/borrowed-books/extension-eligibility', {
+            borrowing_ids: borrowingIds,
+        });
+        cells.forEach((cell) => {
+            const data = eligibility[cell.dataset.borrowingId];
+            if (data) {
+                this._renderCell(cell, data);
+            }
+        });
+    },
+
+    _renderCell: function(cell, data) {
+        cell.textContent = '';
+        if (data.eligible) {
+            const link = document.createElement('a');
+            link.href = data.url;
+            link.className = 'btn btn-sm btn-outline-primary';
+            link.textContent = _t('Extend');
+            cell.appendChild(link);
+        } else if (data.pending_request_id) {
+            const link = document.createElement('a');
+            link.href = `/my/extension-requests/${data.pending_request_id}`;
+            link.className = 'badge bg-warning text-dark';
+            link.textContent = _t('Pending');
+            cell.appendChild(link);
+        } else {
+            const span = document.createElement('span');
+            span.className = 'text-muted';
+            span.title = data.message;
+            span.textContent = '-';
+            cell.appendChild(span);
+        }
+    },
+});
+
+export default publicWidget.registry.ExtensionEligibility;
@@ -0,0 +1,2 @@
+from . import test_notification_outbox
+from . import test_portal_performance
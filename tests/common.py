@@ -0,0 +1,139 @@
+from odoo import fields
+from odoo.addons.mail.tests.common import mail_new_test_user
+from datetime import timedelta
+import random
+
+
+class PortalDatasetMixin:
+    """Seeded generator of portal data: many members, a few of them with long histories.
+    
+    Everything is created with batched create() calls and without chatter, so a
+    dataset of thousands of rows is built in seconds.
+    """
+    
+    # Dataset size
+    MEMBER_COUNT = 2000
+    BOOK_COUNT = 200
+    HEAVY_MEMBER_COUNT = 3
+    HEAVY_BORROWING_COUNT = 300
+    # Borrowings of a heavy member that stay eligible for a new extension request
+    ELIGIBLE_BORROWING_COUNT = 6
+    SEED = 4242
+    
+    @classmethod
+    def _quiet_env(cls, env):
+        """Environment creating records without chatter messages or tracking"""
+        return env(context=dict(env.context, tracking_disable=True, mail_create_nolog=True,
+                                mail_notrack=True, no_reset_password=True))
+    
+    @classmethod
+    def _create_books(cls, env, count):
+        """Books with enough copies for every generated borrowing"""
+        Book = cls._quiet_env(env)['library.book']
+        vals_list = [{
+            'title': f'Perf Book {index:04d}',
+            'author': f'Perf Author {index % 50:02d}',
+            'isbn': f'978-{index:09d}',
+        } for index in range(count)]
+        # Stock fields of library_management_1, when it tracks copies
+        for fname in ('total_copies', 'available_copies'):
+            if fname in Book._fields:
+                for vals in vals_list:
+                    vals[fname] = 10000
+        return Book.create(vals_list)
+    
+    @classmethod
+    def _create_members(cls, env, count, prefix):
+        """Plain library members, without portal users"""
+        return cls._quiet_env(env)['library.member'].create([{
+            'name': f'{prefix} {index:05d}',
+            'email': f'{prefix.lower().replace(" ", ".")}.{index:05d}@example.com',
+        } for index in range(count)])
+    
+    @classmethod
+    def _create_portal_member(cls, env, login):
+        """A portal user linked to its own library member"""
+        user = mail_new_test_user(env, login=login, groups='base.group_portal', name=login.title(),
+                                  email=f'{login}@example.com', password=login)
+        member = cls._quiet_env(env)['library.member'].create({
+            'name': user.name,
+            'email': user.email,
+            'user_id': user.id,
+            'is_portal_user': True,
+        })
+        user.library_member_id = member
+        return user, member
+    
+    @classmethod
+    def _create_history(cls, env, member, books, borrowing_count, eligible_count, rng):
+        """Borrowings of member with approved, rejected and pending extension requests.
+        
+        The last eligible_count borrowings are due soon, not extended and without
+        request, so extension requests can be submitted for them.
+        """
+        env = cls._quiet_env(env)
+        today = fields.Date.today()
+        borrowing_vals = []
+        for index in range(borrowing_count):
+            borrow_date = today - timedelta(days=rng.randint(30, 720))
+            if index >= borrowing_count - eligible_count:
+                borrow_date = today - timedelta(days=12)
+                status, due_date, return_date = 'borrowed', today + timedelta(days=2), False
+            elif index % 5 == 0:
+                status, due_date, return_date = 'overdue', today - timedelta(days=rng.randint(1, 20)), False
+            elif index % 5 == 1:
+                status, due_date, return_date = 'borrowed', today + timedelta(days=rng.randint(5, 20)), False
+            else:
+                due_date = borrow_date + timedelta(days=14)
+                status, return_date = 'returned', due_date + timedelta(days=rng.randint(-5, 5))
+            borrowing_vals.append({
+                'member_id': member.id,
+                'book_id': books[rng.randrange(len(books))].id,
+                'borrow_date': borrow_date,
+                'expected_return_date': due_date,
+                'actual_return_date': return_date,
+                'status': status,
+            })
+        borrowings = env['library.borrowing.record'].create(borrowing_vals)
+        
+        request_vals = []
+        for index, borrowing in enumerate(borrowings[:borrowing_count - eligible_count]):
+            # Closed requests first, then at most one pending request per borrowing
+            for position in range(index % 3):
+                request_vals.append({
+                    'borrowing_record_id': borrowing.id,
+                    'original_expiry_date': borrowing.expected_return_date,
+                    'requested_expiry_date': borrowing.expected_return_date + timedelta(days=7 * (position + 1)),
+                    'request_reason': f'Reason {index}-{position}: still reading this book',
+                    'status': 'rejected' if position % 2 else 'approved',
+                })
+            if borrowing.status == 'borrowed' and index % 4 == 1:
+                request_vals.append({
+                    'borrowing_record_id': borrowing.id,
+                    'original_expiry_date': borrowing.expected_return_date,
+                    'requested_expiry_date': borrowing.expected_return_date + timedelta(days=14),
+                    'request_reason': f'Reason {index}: need more time',
+                })
+        requests = env['library.extension.request'].create(request_vals)
+        return borrowings, requests
+    
+    @classmethod
+    def _generate_portal_dataset(cls, env):
+        """Seed the whole dataset; returns {'heavy': [...], 'light': ...} of (user, member, borrowings, requests)"""
+        rng = random.Random(cls.SEED)
+        books = cls._create_books(env, cls.BOOK_COUNT)
+        cls._create_members(env, cls.MEMBER_COUNT, 'Perf Member')
+        
+        heavy = []
+        for index in range(cls.HEAVY_MEMBER_COUNT):
+            user, member = cls._create_portal_member(env, f'perf_heavy_{index}')
+            borrowings, requests = cls._create_history(
+                env, member, books, cls.HEAVY_BORROWING_COUNT, cls.ELIGIBLE_BORROWING_COUNT, rng)
+            heavy.append((user, member, borrowings, requests))
+        
+        user, member = cls._create_portal_member(env, 'perf_light')
+        borrowings, requests = cls._create_history(env, member, books, 6 + cls.ELIGIBLE_BORROWING_COUNT,
+                                                   cls.ELIGIBLE_BORROWING_COUNT, rng)
+        light = (user, member, borrowings, requests)
+        env.flush_all()
+        return {'heavy': heavy, 'light': light}
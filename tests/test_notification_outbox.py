@@ -0,0 +1,112 @@
+from odoo import fields
+from odoo.addons.base.models.ir_mail_server import IrMailServer
+from odoo.tests import TransactionCase, tagged
+from datetime import timedelta
+from freezegun import freeze_time
+from unittest.mock import patch
+import smtplib
+
+
+class FakeSMTPSession:
+    """SMTP connection stand-in recording messages, refusing some recipients"""
+    
+    smtp_from = False
+    from_filter = False
+    
+    def __init__(self, refused=()):
+        self.refused = set(refused)
+        self.sent = []
+    
+    def send_message(self, message, smtp_from, smtp_to_list):
+        if self.refused & set(smtp_to_list):
+            raise smtplib.SMTPDataError(554, b'Recipient refused')
+        self.sent.append((smtp_from, smtp_to_list))
+        return {}
+
+
+@tagged('post_install', '-at_install')
+class TestNotificationOutbox(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Outbox = cls.env['library.notification.outbox']
+        cls.template = cls.env['mail.template'].create({
+            'name': 'Outbox Test',
+            'model_id': cls.env.ref('base.model_res_partner').id,
+            'subject': 'Library notification',
+            'body_html': '<p>Hello</p>',
+            'email_from': 'library@example.com',
+            'email_to': '{{ object.email }}',
+            'auto_delete': True,
+        })
+        cls.partners = cls.env['res.partner'].create([
+            {'name': 'Outbox Reader', 'email': 'reader@example.com'},
+            {'name': 'Outbox Refused', 'email': 'refused@example.com'},
+        ])
+    
+    def _enqueue(self, partners):
+        return self.Outbox.create([{
+            'template_id': self.template.id,
+            'model': partners._name,
+            'res_id': partner.id,
+        } for partner in partners])
+    
+    def _process(self, session):
+        """Run the cron body through session, with outgoing emails enabled"""
+        with patch.object(IrMailServer, '_is_test_mode', lambda self: False):
+            return self.Outbox._cron_process_outbox(smtp_session=session)
+    
+    def test_batch_sent_through_session(self):
+        """Every due entry is rendered and sent over the given connection"""
+        entries = self._enqueue(self.partners[0])
+        session = FakeSMTPSession()
+        
+        self.assertEqual(self._process(session), 1)
+        self.assertEqual(len(session.sent), 1)
+        self.assertEqual(entries.state, 'sent')
+        self.assertEqual(entries.attempt_count, 1)
+        self.assertFalse(entries.last_error)
+    
+    @freeze_time('2026-03-02 10:00:00')
+    def test_failed_entries_back_off_then_give_up(self):
+        """Refused emails are retried with exponential backoff until MAX_ATTEMPTS"""
+        sent_entry, refused_entry = self._enqueue(self.partners)
+        session = FakeSMTPSession(refused={'refused@example.com'})
+        
+        self.assertEqual(self._process(session), 1)
+        self.assertEqual(sent_entry.state, 'sent')
+        self.assertEqual(refused_entry.state, 'pending')
+        self.assertEqual(refused_entry.attempt_count, 1)
+        self.assertTrue(refused_entry.last_error)
+        now = fields.Datetime.now()
+        self.assertEqual(refused_entry.next_attempt_date, now + timedelta(minutes=self.Outbox.BACKOFF_MINUTES))
+        
+        # Not due yet: the next run leaves it alone
+        self.assertEqual(self._process(session), 0)
+        self.assertEqual(refused_entry.attempt_count, 1)
+        
+        for attempts in range(2, self.Outbox.MAX_ATTEMPTS):
+            refused_entry.next_attempt_date = now
+            self._process(session)
+            self.assertEqual(refused_entry.state, 'pending')
+            self.assertEqual(refused_entry.attempt_count, attempts)
+            self.assertEqual(
+                refused_entry.next_attempt_date,
+                now + timedelta(minutes=self.Outbox.BACKOFF_MINUTES * 2 ** (attempts - 1)))
+        
+        refused_entry.next_attempt_date = now
+        self._process(session)
+        self.assertEqual(refused_entry.state, 'failed')
+        self.assertEqual(refused_entry.attempt_count, self.Outbox.MAX_ATTEMPTS)
+        self.assertEqual(len(session.sent), 1, 'Only the accepted email was delivered')
+    
+    def test_orphan_entries_fail_at_once(self):
+        """Entries whose record is gone fail without retry"""
+        partner = self.env['res.partner'].create({'name': 'Outbox Gone', 'email': 'gone@example.com'})
+        entry = self._enqueue(partner)
+        partner.unlink()
+        
+        self._process(FakeSMTPSession())
+        self.assertEqual(entry.state, 'failed')
+        self.assertEqual(entry.attempt_count, 1)
@@ -0,0 +1,151 @@
+from odoo import fields, http
+from odoo.tests import HttpCase, tagged
+from .common import PortalDatasetMixin
+from datetime import timedelta
+import time
+
+# Queries of a warm request per route. A route going over its budget, or needing
+# more queries for a member with hundreds of records than for one with a handful,
+# usually means a loop started reading records one by one.
+QUERY_BUDGETS = {
+    'home': 45,
+    'members': 35,
+    'borrowed_books': 40,
+    'borrowing_detail': 45,
+    'extension_requests': 40,
+    'extension_request_detail': 40,
+    'request_extension_form': 40,
+    'request_extension_post': 90,
+    'borrowing_report': 60,
+    'extension_request_report': 60,
+}
+
+# Seconds per warm request
+WALL_TIME_BUDGETS = {
+    'default': 1.5,
+    'request_extension_post': 3.0,
+    'borrowing_report': 10.0,
+    'extension_request_report': 10.0,
+}
+
+# Extra queries tolerated for the heavy member over the light one
+SCALING_TOLERANCE = 3
+
+
+@tagged('post_install', '-at_install', 'book_borrower_portal_perf')
+class TestPortalPerformance(PortalDatasetMixin, HttpCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        dataset = cls._generate_portal_dataset(cls.env)
+        cls.heavy = dataset['heavy']
+        cls.light = dataset['light']
+    
+    def _get_route_records(self, borrowings, requests):
+        """(borrowing, extension request) with the most history, targeted by the routes"""
+        return max(borrowings, key=lambda record: len(record.extension_request_ids)), requests[-1]
+    
+    def _get_routes(self, member, borrowings, requests):
+        """GET routes of the portal, pointing at the records with the most history"""
+        borrowing, extension_request = self._get_route_records(borrowings, requests)
+        eligible = self._get_eligible_borrowings(borrowings)
+        return {
+            'home': '/my',
+            'members': '/my/members',
+            'borrowed_books': '/my/borrowed-books',
+            'borrowing_detail': f'/my/borrowed-books/{borrowing.id}',
+            'extension_requests': '/my/extension-requests',
+            'extension_request_detail': f'/my/extension-requests/{extension_request.id}',
+            'request_extension_form': f'/my/borrowed-books/{eligible[0].id}/request-extension',
+            'borrowing_report': f'/my/borrowed-books/print/{borrowing.id}',
+            'extension_request_report': f'/my/extension-requests/print/{extension_request.id}',
+        }
+    
+    def _get_eligible_borrowings(self, borrowings):
+        """Borrowings generated without request, due soon"""
+        return borrowings.filtered(lambda record: record.status == 'borrowed' and not record.extension_request_ids)
+    
+    def _measure(self, url, data=None):
+        """Send a request and return (response, query count, seconds)"""
+        cr = self.registry.test_cr
+        queries_before = cr.sql_log_count
+        started = time.perf_counter()
+        response = self.url_open(url, data=data, timeout=60, allow_redirects=False)
+        elapsed = time.perf_counter() - started
+        return response, cr.sql_log_count - queries_before, elapsed
+    
+    def _measure_warm(self, url, uncached_reports=None):
+        """Measure a GET once caches (templates, ormcaches) are filled.
+        
+        The PDFs cached for uncached_reports by the warm-up are dropped, so that
+        report routes measure a real rendering and not an attachment lookup.
+        """
+        self.url_open(url, timeout=60, allow_redirects=False)
+        if uncached_reports:
+            self.env['library.report.cache']._invalidate_report_cache(uncached_reports)
+            self.env.flush_all()
+        return self._measure(url)
+    
+    def _assert_budget(self, name, query_count, elapsed):
+        """Fail when a route exceeds its query or wall-time budget"""
+        self.assertLessEqual(
+            query_count, QUERY_BUDGETS[name],
+            f'{name}: {query_count} queries, budget is {QUERY_BUDGETS[name]}')
+        time_budget = WALL_TIME_BUDGETS.get(name, WALL_TIME_BUDGETS['default'])
+        self.assertLessEqual(
+            elapsed, time_budget,
+            f'{name}: took {elapsed:.2f}s, budget is {time_budget}s')
+    
+    def _measure_routes(self, user, member, borrowings, requests):
+        """{route name: query count} of the warm GET routes of a member, checked against the budgets"""
+        self.authenticate(user.login, user.login)
+        borrowing, extension_request = self._get_route_records(borrowings, requests)
+        reports = {'borrowing_report': borrowing, 'extension_request_report': extension_request}
+        counts = {}
+        for name, url in self._get_routes(member, borrowings, requests).items():
+            with self.subTest(route=name, member=member.name):
+                response, query_count, elapsed = self._measure_warm(url, reports.get(name))
+                self.assertEqual(response.status_code, 200, f'{name}: {url} answered {response.status_code}')
+                self._assert_budget(name, query_count, elapsed)
+                counts[name] = query_count
+        return counts
+    
+    def test_get_routes_within_budget(self):
+        """Every portal page of members with hundreds of records stays within its budgets"""
+        for user, member, borrowings, requests in self.heavy:
+            self._measure_routes(user, member, borrowings, requests)
+    
+    def test_get_routes_do_not_scale_with_history(self):
+        """A member with hundreds of records costs as many queries as one with a handful"""
+        light_counts = self._measure_routes(*self.light)
+        heavy_counts = self._measure_routes(*self.heavy[0])
+        for name, light_count in light_counts.items():
+            with self.subTest(route=name):
+                self.assertLessEqual(
+                    heavy_counts[name], light_count + SCALING_TOLERANCE,
+                    f'{name}: {heavy_counts[name]} queries for the heavy member, {light_count} for the light one')
+    
+    def test_request_extension_post_within_budget(self):
+        """Submitting an extension request stays within its budgets and does not scale with history"""
+        counts = {}
+        for label, (user, member, borrowings, _requests) in (('light', self.light), ('heavy', self.heavy[0])):
+            self.authenticate(user.login, user.login)
+            eligible = self._get_eligible_borrowings(borrowings)
+            # The first submission warms the caches, the second one is measured
+            for borrowing in eligible[:2]:
+                url = f'/my/borrowed-books/{borrowing.id}/request-extension'
+                response, query_count, elapsed = self._measure(url, data={
+                    'requested_expiry_date': fields.Date.to_string(borrowing.expected_return_date + timedelta(days=7)),
+                    'request_reason': 'Performance test',
+                    'csrf_token': http.Request.csrf_token(self),
+                })
+                self.assertEqual(response.status_code, 200)
+            self.assertTrue(
+                self.env['library.extension.request'].search_count([
+                    ('borrowing_record_id', '=', borrowing.id), ('status', '=', 'pending')]),
+                'The extension request was not created')
+            with self.subTest(member=label):
+                self._assert_budget('request_extension_post', query_count, elapsed)
+            counts[label] = query_count
+        self.assertLessEqual(counts['heavy'], counts['light'] + SCALING_TOLERANCE)
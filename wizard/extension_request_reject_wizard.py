@@ -9,44 +9,72 @@ class ExtensionRequestRejectWizard(models.TransientModel):
     request_id = fields.Many2one(
         'library.extension.request',
         string='Extension Request',
-        required=True,
         readonly=True
     )
+    request_ids = fields.Many2many(
+        'library.extension.request',
+        string='Extension Requests',
+        readonly=True,
+        help='Extension requests rejected with the shared reason'
+    )
+    request_count = fields.Integer(
+        string='Number of Requests',
+        compute='_compute_request_count'
+    )
     rejection_reason = fields.Text(
         string='Rejection Reason',
         required=True,
         help='Please provide a reason for rejecting this extension request'
     )
     
+    @api.model
+    def default_get(self, fields_list):
+        """Collect the requests to reject from the context"""
+        res = super().default_get(fields_list)
+        if 'request_ids' in fields_list and not res.get('request_ids'):
+            request_ids = []
+            if self.env.context.get('active_model') == 'library.extension.request':
+                request_ids = self.env.context.get('active_ids') or []
+            if not request_ids and res.get('request_id'):
+                request_ids = [res['request_id']]
+            if request_ids:
+                res['request_ids'] = [(6, 0, request_ids)]
+        return res
+    
+    @api.depends('request_id', 'request_ids')
+    def _compute_request_count(self):
+        """Count the requests handled by this wizard"""
+        for wizard in self:
+            wizard.request_count = len(wizard._get_requests())
+    
+    def _get_requests(self):
+        """Return all extension requests targeted by this wizard"""
+        self.ensure_one()
+        return self.request_ids | self.request_id
+    
     def action_reject_request(self):
-        """Reject the extension request with reason"""
+        """Reject the extension request(s) with reason"""
         self.ensure_one()
-        if not self.request_id:
+        requests = self._get_requests()
+        if not requests:
             raise UserError('No extension request specified.')
         
-        if self.request_id.status != 'pending':
+        if len(requests) == 1 and requests.status != 'pending':
             raise UserError('Only pending requests can be rejected.')
         
-        # Get or create reviewer librarian record using the extension request helper
-        reviewer_id = self.request_id._get_or_create_reviewer_librarian()
-        
-        # Update extension request
-        self.request_id.write({
-            'status': 'rejected',
-            'reviewed_by': reviewer_id,
-            'review_date': fields.Datetime.now(),
-            'rejection_reason': self.rejection_reason
-        })
+        rejected, failures = requests._reject_requests(self.rejection_reason)
         
-        # Send notification email
-        self.request_id._send_rejection_notification()
-        
-        return {
-            'type': 'ir.actions.client',
-            'tag': 'display_notification',
-            'params': {
-                'title': 'Extension Rejected',
-                'message': f'Extension request {self.request_id.name} has been rejected.',
-                'type': 'success',
+        if len(requests) == 1:
+            if failures:
+                raise UserError(failures[requests])
+            return {
+                'type': 'ir.actions.client',
+                'tag': 'display_notification',
+                'params': {
+                    'title': 'Extension Rejected',
+                    'message': f'Extension request {requests.name} has been rejected.',
+                    'type': 'success',
+                }
             }
-        }
\ No newline at end of file
+        
+        return requests._get_bulk_review_notification('Extensions Rejected', 'rejected', rejected, failures)